@@ -67,10 +67,11 @@ class IndexDBLogHandler(LogToBufferHandler):
         )
 
     def emit(self, logRecord: LogRecord) -> None:
-        """Emit implementation"""
+        """Emit implementation, records are only formatted when printed,
+        messages of buffered records are formatted when extracted"""
         self.logRecordBuffer.append(logRecord)
-        logEntry = self.format(logRecord)
         if self.verbose:
+            logEntry = self.format(logRecord)
             file = sys.stderr if self.logFile else None
             try:
                 print(logEntry, file=file)
@@ -95,15 +96,12 @@ class IndexDBLogHandler(LogToBufferHandler):
             timestamp = datetime.datetime.fromtimestamp(rec.created).replace(
                 microsecond=0
             )
-            task = (
-                getattr(rec, "messageCode", "").split(".")[1]
-                if len(getattr(rec, "messageCode", "").split(".")) > 1
-                else None
-            )
+            code_parts = getattr(rec, "messageCode", "").split(".")
+            task = code_parts[1] if len(code_parts) > 1 else None
             log_row = {
                 "timestamp_at": timestamp,
                 "task": task,
-                "message": rec.message,
+                "message": rec.getMessage(),
                 "time_taken": None,
                 "subject": None,
             }
@@ -1,8 +1,12 @@
 """Log messages, errors, links, task names, country codes ..."""
 from __future__ import annotations
 
+import datetime
+import functools
 import logging
 from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 from urllib import request
 
@@ -20,6 +24,33 @@ except ModuleNotFoundError as exc:
     raise Exception("Please add path to arelle to python path") from exc
 
 LOCAL_CACHE_DIR_NAME: str = "index-db-cache"
+RESPONSES_CACHE_DIR_NAME: str = "responses"
+FEEDS_CACHE_DIR_NAME: str = "feeds"
+FEEDS_CACHE_MAX_FILES: int = 300
+DB_POOL_SIZE_ENV_VAR: str = "XI_DB_POOL_SIZE"
+LOG_INSERT_BATCH_SIZE: int = 500
+TRACKER_COMMIT_EVERY: int = 100
+# secs
+TRACKER_COMMIT_INTERVAL: float = 2.0
+TRACKER_NOTES_MAX: int = 32
+# secs between progress prints
+PROGRESS_PRINT_INTERVAL: float = 0.1
+SEC_MAX_REQUESTS_PER_SECOND: int = 10
+ESEF_MAX_REQUESTS_PER_SECOND: int = 5
+# gleif api allows 60 requests per minute
+GLEIF_MAX_REQUESTS_PER_SECOND: int = 1
+# request failures that are not retried
+HTTP_PERMANENT_ERROR_CODES: frozenset[int] = frozenset({400, 404, 410})
+# upper bound of inclusive date range searches
+ONE_DAY: datetime.timedelta = datetime.timedelta(days=1)
+FILERS_SAVE_BATCH_SIZE: int = 100
+# max filers fetches queued or in flight
+FILERS_FETCH_QUEUE_SIZE: int = 1000
+ESEF_FILINGS_SAVE_BATCH_SIZE: int = 100
+# below sqlite default of 999 parameters per statement
+QUERY_IN_CHUNK_SIZE: int = 900
+FILINGS_YIELD_PER: int = 500
+LEI_FETCH_MAX_WORKERS: int = 8
 MOCK_TEST_DATA_DIR_NAME: str = "mock_test_data"
 LOG_HANDLER_NAME: str = RSS_DB_LOG_HANDLER_NAME
 RSS_FEEDS: dict[str, str] = rssFeeds
@@ -114,15 +145,29 @@ ESEF_LOAD_ERRORS: set[str] = {
 
 def log_template(
     suffix: str, file: str | Cntlr | None, level: int = logging.INFO
-) -> dict[str, Any]:
-    """Convenience for quickly filling out needed params in log record"""
-    return {
-        "messageCode": f"{RSS_DB_PREFIX}.{suffix}",
-        "file": str(file)
+) -> Mapping[str, Any]:
+    """Convenience for quickly filling out needed params in log record,
+    returned mapping is read only and shared between calls"""
+    return _log_template(
+        suffix,
+        str(file)
         if isinstance(file, (str, int))
         else getattr(file, "rss_dbname", ""),
-        "level": level,
-    }
+        level,
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _log_template(
+    suffix: str, file_name: str, level: int
+) -> Mapping[str, Any]:
+    return MappingProxyType(
+        {
+            "messageCode": f"{RSS_DB_PREFIX}.{suffix}",
+            "file": file_name,
+            "level": level,
+        }
+    )
 
 
 def get_edgar_state_codes(
@@ -2,22 +2,36 @@
 from __future__ import annotations
 
 import datetime
+import gzip
+import hashlib
 import json
 import logging
+import mmap
 import os
 import pathlib
 import pickle
 import re
 import sys
+import tempfile
+import threading
 import time
 import traceback
 from calendar import monthrange
-from collections import defaultdict
+from collections import Counter
+from collections.abc import Iterable
 from collections.abc import Iterator
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from operator import attrgetter
 from re import Pattern
 from typing import Any
+from typing import Callable
 from typing import cast
 from urllib.parse import urljoin
+from urllib.parse import urlparse
+from urllib.request import Request
+from urllib.request import url2pathname
 
 import pytz
 from dateutil import parser
@@ -50,6 +64,31 @@ except ModuleNotFoundError as exc:
 
 
 file_id_re: Pattern[str] = re.compile(r"\d{4}-\d{2}")
+# ticker cells of S&P 100 constituents table
+sp_100_cells_xpath: etree.XPath = etree.XPath(
+    './/table[@id="constituents"]//tbody/tr/td[1]'
+)
+# ticker, date first added and cik cells of S&P 500 constituents table in
+# document order (3 cells per row)
+sp_500_cells_xpath: etree.XPath = etree.XPath(
+    '//table[@id="constituents"]/tbody/tr[count(td) > 3]'
+    "/td[position() = 1 or position() = last() - 2 "
+    "or position() = last() - 1]"
+)
+# byte patterns to tally xbrl-json facts languages without parsing json
+fact_lang_re: Pattern[bytes] = re.compile(rb'"language"\s*:\s*"([^"\\]*)"')
+fact_dimensions_re: Pattern[bytes] = re.compile(rb'"dimensions"\s*:')
+# first bytes of gzip files, pickle caches may or may not be compressed
+gzip_magic: bytes = b"\x1f\x8b"
+# time zones used in SEC feeds dates
+sec_tzinfos: dict[str, str] = {"EST": "UTC-5:00", "EDT": "UTC-4:00"}
+csv_sep_re: Pattern[str] = re.compile(r"\s*,\s*")
+
+
+def split_csv(value: str, cast_to: Callable[[str], Any] = str) -> list[Any]:
+    """Split comma separated values, values are stripped and empty values
+    are dropped"""
+    return [cast_to(x) for x in csv_sep_re.split(value.strip()) if x]
 
 
 def truncate_string(str_x: str, _n: int = 50) -> str:
@@ -92,6 +131,34 @@ def get_time_elapsed(start_time: float) -> float:
     return round(time.perf_counter() - start_time, 3)
 
 
+class TokenBucket:
+    """Thread safe token bucket rate limiter, `acquire` only sleeps when
+    no token is left, tokens refill at `rate` per second up to
+    `capacity`"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token, waiting for it if the bucket is empty"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._last_refill) * self.rate,
+            )
+            self._last_refill = now
+            # a negative balance reserves the next tokens for this caller
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
 def get_monthly_rss_feeds_links(
     cntlr: Cntlr | None = None, dbname: str | None = None, loc: Any = None
 ) -> list[dict[str, datetime.datetime | str | bool]]:
@@ -234,6 +301,16 @@ def date_filter_feeds(
     return filtered_feeds
 
 
+def parse_feed_date(value: str) -> datetime.datetime:
+    """Parses feed date stored as text, ISO formatted dates (as stored by
+    the database) are parsed with `fromisoformat`, falling back to the
+    slower dateutil parser for other formats"""
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return parser.parse(value, tzinfos=sec_tzinfos)
+
+
 def get_new_and_modified_feeds(
     existing_feeds_dict: dict[str, datetime.datetime],
     feeds: list[dict[str, Any]],
@@ -335,9 +412,7 @@ def get_feed_info(
             tag = "feed_link"
         elif tag in ("pubDate", "lastBuildDate") and inf.text is not None:
             try:
-                val = parser.parse(
-                    inf.text, tzinfos={"EST": "UTC-5:00", "EDT": "UTC-4:00"}
-                )
+                val = parser.parse(inf.text, tzinfos=sec_tzinfos)
             except Exception:
                 pass
         else:
@@ -721,8 +796,7 @@ def get_sec_cik_ticker_mapping(cntlr: Cntlr) -> list[dict[str, Any]]:
             getattr(SEC.SecCikTickerMapping, "__tablename__", "")
             + "-data.pkl",
         )
-        with open(store_filename, "wb") as pkl:
-            pickle.dump(result, pkl)
+        pickle_rows(result, store_filename)
         time_taken = get_time_elapsed(start_at)
 
         msg = (
@@ -812,35 +886,222 @@ def get_esef_filing(
     return esef_filing
 
 
+def get_response_cache_path(cntlr: Cntlr, url: str) -> str | None:
+    """Path of the cached parsed response of `url` in db cache folder,
+    None if there is no db cache folder or `url` is a local file"""
+    db_cache_dir: str | None = getattr(cntlr, "db_cache_dir", None)
+    if db_cache_dir is None or url.startswith("file://"):
+        return None
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.join(
+        db_cache_dir, constants.RESPONSES_CACHE_DIR_NAME, key + ".pkl"
+    )
+
+
+def get_response_validator(resp: Any) -> str | None:
+    """ETag (or Last-Modified) of response `resp`, None if not available"""
+    validator: str | None = resp.headers.get("ETag") or resp.headers.get(
+        "Last-Modified"
+    )
+    return validator
+
+
+def get_url_validator(cntlr: Cntlr, url: str) -> str | None:
+    """Gets ETag (or Last-Modified) of `url` with a HEAD request,
+    None if not available"""
+    try:
+        resp = cntlr.webCache.opener.open(
+            Request(url, method="HEAD"), timeout=5
+        )
+        validator = get_response_validator(resp)
+        resp.close()
+    except Exception:
+        return None
+    return validator
+
+
+def load_cached_response(
+    cntlr: Cntlr, url: str, validator: str | None
+) -> Any | None:
+    """Loads parsed response of `url` cached by `store_cached_response`,
+    None if not cached or cached with a different validator"""
+    cache_path = get_response_cache_path(cntlr, url)
+    if validator is None or cache_path is None:
+        return None
+    try:
+        with open(cache_path, "rb") as pkl:
+            cached_validator, result = pickle.load(pkl)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    return result if cached_validator == validator else None
+
+
+def store_cached_response(
+    cntlr: Cntlr, url: str, validator: str | None, result: Any
+) -> None:
+    """Caches parsed response of `url` with its validator"""
+    cache_path = get_response_cache_path(cntlr, url)
+    if validator is None or cache_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "wb") as pkl:
+            pickle.dump((validator, result), pkl, protocol=5)
+    except OSError:
+        pass
+
+
+def get_feed_cache_path(
+    cntlr: Cntlr, link: str, last_modified_date: Any
+) -> str | None:
+    """Path of the cached extracted data of feed `link` as of
+    `last_modified_date` in db cache folder, None if there is no db
+    cache folder or `link` is a local file"""
+    db_cache_dir: str | None = getattr(cntlr, "db_cache_dir", None)
+    if (
+        db_cache_dir is None
+        or link.startswith("file://")
+        or last_modified_date is None
+    ):
+        return None
+    key = hashlib.blake2b(
+        f"{link}|{last_modified_date}".encode(), digest_size=16
+    ).hexdigest()
+    return os.path.join(
+        db_cache_dir, constants.FEEDS_CACHE_DIR_NAME, key + ".pkl.gz"
+    )
+
+
+def is_feed_cached(cntlr: Cntlr, link: str, last_modified_date: Any) -> bool:
+    """Whether extracted data of feed `link` as of `last_modified_date`
+    is in feeds cache"""
+    cache_path = get_feed_cache_path(cntlr, link, last_modified_date)
+    return cache_path is not None and os.path.isfile(cache_path)
+
+
+def load_cached_feed(
+    cntlr: Cntlr, link: str, last_modified_date: Any
+) -> tuple[dict[str, Any], list[Any], list[Any]] | None:
+    """Loads feed data, filings and files lists cached by
+    `store_cached_feed`, None if not cached"""
+    cache_path = get_feed_cache_path(cntlr, link, last_modified_date)
+    if cache_path is None:
+        return None
+    try:
+        with gzip.open(cache_path, "rb") as pkl:
+            result = cast(
+                tuple[dict[str, Any], list[Any], list[Any]], pickle.load(pkl)
+            )
+        # keep recently used feeds when pruning
+        os.utime(cache_path)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    return result
+
+
+def store_cached_feed(
+    cntlr: Cntlr,
+    link: str,
+    last_modified_date: Any,
+    feed_data: dict[str, Any],
+    filings_list: list[Any],
+    files_list: list[Any],
+) -> None:
+    """Caches extracted feed data, then removes least recently used
+    feeds over `FEEDS_CACHE_MAX_FILES`"""
+    cache_path = get_feed_cache_path(cntlr, link, last_modified_date)
+    if cache_path is None:
+        return
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with gzip.open(cache_path, "wb", compresslevel=1) as pkl:
+            pickle.dump((feed_data, filings_list, files_list), pkl, protocol=5)
+        with os.scandir(cache_dir) as entries:
+            cached = sorted(
+                (x for x in entries if x.is_file()),
+                key=lambda x: x.stat().st_mtime_ns,
+            )
+        for entry in cached[: -constants.FEEDS_CACHE_MAX_FILES]:
+            os.remove(entry.path)
+    except OSError:
+        pass
+
+
+def tally_esef_facts_languages(
+    data: bytes | mmap.mmap,
+) -> list[dict[str, Any]]:
+    """Tallies facts per language in raw xbrl-json instance bytes"""
+    result: list[dict[str, Any]] = []
+    if data.find(b'"language"') == -1:
+        # no fact has a language dimension, nothing to tally
+        return result
+    counts = Counter(
+        lang.decode() for lang in fact_lang_re.findall(data) if lang
+    )
+    facts_in_report = len(fact_dimensions_re.findall(data))
+    for _lang, _count in counts.items():
+        row = {
+            str(ESEF.EsefInferredFilingLanguage.lang.key): _lang,
+            str(ESEF.EsefInferredFilingLanguage.lang_name.key): getattr(
+                languages.get(alpha_2=_lang), "name", None
+            ),
+            str(ESEF.EsefInferredFilingLanguage.facts_in_lang.key): _count,
+            str(
+                ESEF.EsefInferredFilingLanguage.facts_in_report.key
+            ): facts_in_report,
+        }
+        result.append(row)
+    return result
+
+
 def infer_esef_filing_language(
-    cntlr: Cntlr, xbrl_json_instance_link: str
+    cntlr: Cntlr,
+    xbrl_json_instance_link: str,
+    limiter: TokenBucket | None = None,
 ) -> list[dict[str, Any]]:
-    """Reads in json instance and gets language used per fact if available."""
-    is_file = xbrl_json_instance_link.startswith("file://")
+    """Reads in json instance and gets language used per fact if available.
+    Facts and languages are tallied by scanning the raw json bytes, every
+    xbrl-json fact has a `dimensions` object, and the language of a fact is
+    its `language` dimension. Results are cached per instance ETag, local
+    instances are memory mapped instead of read through the web cache.
+    Remote requests wait for `limiter` if given."""
+    if xbrl_json_instance_link.startswith("file://"):
+        file_path = url2pathname(urlparse(xbrl_json_instance_link).path)
+        if os.path.getsize(file_path) == 0:
+            # empty files can't be memory mapped
+            return []
+        with open(file_path, "rb") as inst, mmap.mmap(
+            inst.fileno(), 0, access=mmap.ACCESS_READ
+        ) as inst_data:
+            return tally_esef_facts_languages(inst_data)
     result: list[dict[str, Any]] = []
+    cache_path = get_response_cache_path(cntlr, xbrl_json_instance_link)
+    # only revalidate instances that were cached before, new instances
+    # are fetched with a single request
+    if cache_path is not None and os.path.isfile(cache_path):
+        if limiter is not None:
+            limiter.acquire()
+        cached = load_cached_response(
+            cntlr,
+            xbrl_json_instance_link,
+            get_url_validator(cntlr, xbrl_json_instance_link),
+        )
+        if cached is not None:
+            return cast(list[dict[str, Any]], cached)
+    if limiter is not None:
+        limiter.acquire()
     resp = cntlr.webCache.opener.open(xbrl_json_instance_link, timeout=5)
-    if resp.code == 200 or is_file:
-        resp_data = json.loads(resp.read().decode())
-        counts: defaultdict[str, int] = defaultdict(int)
-        instance_facts = resp_data["facts"]
-        facts_in_report = len(instance_facts)
-        for _fct_id, fct in instance_facts.items():
-            lang = fct.get("dimensions", False).get("language", False)
-            if lang:
-                counts[lang] += 1
-        for _lang, _count in counts.items():
-            row = {
-                str(ESEF.EsefInferredFilingLanguage.lang.key): _lang,
-                str(ESEF.EsefInferredFilingLanguage.lang_name.key): getattr(
-                    languages.get(alpha_2=_lang), "name", None
-                ),
-                str(ESEF.EsefInferredFilingLanguage.facts_in_lang.key): _count,
-                str(
-                    ESEF.EsefInferredFilingLanguage.facts_in_report.key
-                ): facts_in_report,
-            }
-            result.append(row)
-        del resp_data, instance_facts
+    if resp.code == 200:
+        resp_data: bytes = resp.read()
+        result = tally_esef_facts_languages(resp_data)
+        del resp_data
+        store_cached_response(
+            cntlr,
+            xbrl_json_instance_link,
+            get_response_validator(resp),
+            result,
+        )
     return result
 
 
@@ -865,26 +1126,90 @@ def get_esef_all_filing_info(
     filing_addr: str, filing_dict: dict[str, Any]
 ) -> tuple[dict[str, Any], list[Any], list[Any]]:
     """Grouping all functions that extract ESEF filing information
-    for each table"""
-    filing = filing_dict.copy()
+    for each table, `filing_dict` is only read from, never modified"""
     esef_filing: dict[str, Any] = {}
     esef_error: list[Any] = []
     esef_filing_langs: list[dict[str, str | None]] = []
     is_loadable: bool = True
     load_error: str | None = None
-    esef_filing_langs = get_esef_filing_langs(filing)
-    esef_error, is_loadable, load_error = get_esef_errors(filing)
-    esef_filing = get_esef_filing(filing_addr, filing, is_loadable, load_error)
+    esef_filing_langs = get_esef_filing_langs(filing_dict)
+    esef_error, is_loadable, load_error = get_esef_errors(filing_dict)
+    esef_filing = get_esef_filing(
+        filing_addr, filing_dict, is_loadable, load_error
+    )
     return esef_filing, esef_error, esef_filing_langs
 
 
+def get_esef_entity_isins(
+    cntlr: Cntlr,
+    lei: str,
+    is_test: bool = False,
+    test_data_url: pathlib.Path | None = None,
+    limiter: TokenBucket | None = None,
+) -> str | None:
+    """Get comma separated ISINs of an entity from lei api, requests wait
+    for `limiter` if given"""
+    isin_uri = f"https://api.gleif.org/api/v1/lei-records/{lei}/isins"
+    if is_test and isinstance(test_data_url, pathlib.Path):
+        isin_uri = test_data_url.as_uri() + f"/esef/isin/{lei}"
+    elif limiter is not None:
+        limiter.acquire()
+    isin_resp = cntlr.webCache.opener.open(isin_uri)
+    isin_data = json.loads(isin_resp.read().decode())
+    isin: str | None = None
+    if isin_data.get("data", False):
+        isin = ",".join(
+            [
+                isin.get("attributes", {}).get("isin", None)
+                for isin in isin_data["data"]
+            ]
+        )
+    return isin
+
+
+def prefetch_esef_entities_isins(
+    cntlr: Cntlr,
+    leis: list[str],
+    is_test: bool = False,
+    test_data_url: pathlib.Path | None = None,
+    max_workers: int = 8,
+    limiter: TokenBucket | None = None,
+) -> dict[str, str | None]:
+    """Concurrently get ISINs for a batch of entities from lei api, returns
+    {lei: isins, ...}, leis that failed are left out to be retried by
+    `extract_esef_entity_lei_info`"""
+    result: dict[str, str | None] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                get_esef_entity_isins,
+                cntlr,
+                lei,
+                is_test,
+                test_data_url,
+                limiter,
+            ): lei
+            for lei in leis
+        }
+        for future in as_completed(futures):
+            try:
+                result[futures[future]] = future.result()
+            except Exception:
+                pass
+    return result
+
+
 def extract_esef_entity_lei_info(
     cntlr: Cntlr,
     entity_lei_data: dict[str, Any],
     is_test: bool = False,
     test_data_url: pathlib.Path | None = None,
+    prefetched_isins: dict[str, str | None] | None = None,
+    limiter: TokenBucket | None = None,
 ) -> tuple[dict[str, Any], list[Any]]:
-    """Extract entity information from data retrieved from lei api"""
+    """Extract entity information from data retrieved from lei api, ISINs
+    are taken from `prefetched_isins` if available otherwise retrieved
+    from lei api"""
     esef_entity: dict[str, Any] = {}
     esef_other_names_list: list[Any] = []
     lei: str = entity_lei_data["attributes"]["lei"]
@@ -931,28 +1256,24 @@ def extract_esef_entity_lei_info(
             (x.get("name", "UNKNOWN"), x.get("type", "UNKNOWN"))
             for x in lei_other_names
         }
-        for other_name in unique_other_names:
-            esef_other_name = {}
-            esef_other_name[ESEF.EsefEntityOtherName.entity_lei.key] = lei
-            esef_other_name[
-                ESEF.EsefEntityOtherName.other_name.key
-            ] = other_name[0]
-            esef_other_name[
-                ESEF.EsefEntityOtherName.other_name_type.key
-            ] = other_name[1]
-            esef_other_names_list.append(esef_other_name)
-    isin_uri = f"https://api.gleif.org/api/v1/lei-records/{lei}/isins"
-    if is_test and isinstance(test_data_url, pathlib.Path):
-        isin_uri = test_data_url.as_uri() + f"/esef/isin/{lei}"
-    isin_resp = cntlr.webCache.opener.open(isin_uri)
-    isin_data = json.loads(isin_resp.read().decode())
-    if isin_data.get("data", False):
-        isin = ",".join(
-            [
-                isin.get("attributes", {}).get("isin", None)
-                for isin in isin_data["data"]
-            ]
+        lei_key = ESEF.EsefEntityOtherName.entity_lei.key
+        other_name_key = ESEF.EsefEntityOtherName.other_name.key
+        other_name_type_key = ESEF.EsefEntityOtherName.other_name_type.key
+        esef_other_names_list = [
+            {
+                lei_key: lei,
+                other_name_key: other_name,
+                other_name_type_key: other_name_type,
+            }
+            for other_name, other_name_type in unique_other_names
+        ]
+    if prefetched_isins is not None and lei in prefetched_isins:
+        isin = prefetched_isins[lei]
+    else:
+        isin = get_esef_entity_isins(
+            cntlr, lei, is_test, test_data_url, limiter
         )
+    if isin is not None:
         esef_entity[str(ESEF.EsefEntity.lei_isin.key)] = isin
     return esef_entity, esef_other_names_list
 
@@ -970,8 +1291,16 @@ def get_esef_filings_index(
     file = cntlr.webCache.getfilename(link, reload=reload_cache)
     esef_index: dict[str, Any]
     if isinstance(file, str) and os.path.exists(file):
+        # web cache decides if the index is fresh, so the parsed index is
+        # reused as long as the downloaded file is unchanged
+        file_stat = os.stat(file)
+        validator = f"{file_stat.st_mtime_ns}-{file_stat.st_size}"
+        cached = load_cached_response(cntlr, link, validator)
+        if cached is not None:
+            return base_url, cast(dict[str, Any], cached)
         with open(file, "r", encoding="utf-8") as esf:
             esef_index = json.load(esf)
+        store_cached_response(cntlr, link, validator, esef_index)
     return base_url, esef_index
 
 
@@ -981,19 +1310,10 @@ def get_sp_100(cntlr: Cntlr) -> list[str]:
     sp100_resp = cntlr.webCache.opener.open(url)
     tree = html.parse(sp100_resp)
     root = tree.getroot()
-    trs = root.xpath('.//table[@id="constituents"]//tbody/tr')
-    sp_100_tkrs = []
-    for _tr in trs:
-        sp_100_tkrs.append(
-            tuple(
-                d.text.replace("\n", "")
-                if d.text
-                else d.xpath(".//a/text()")[0]
-                for d in _tr.findall("td")
-            )
-        )
-
-    tks_site = [x[0].lower().replace(".", "-") for x in sp_100_tkrs if x]
+    tks_cells = cast(list[html.HtmlElement], sp_100_cells_xpath(root))
+    tks_site = [
+        x.text_content().strip().lower().replace(".", "-") for x in tks_cells
+    ]
     tks_site.sort()
     return list(set(tks_site))
 
@@ -1004,26 +1324,13 @@ def get_sp_500(cntlr: Cntlr) -> list[tuple[Any, Any, Any]]:
     sp500_resp = cntlr.webCache.opener.open(url)
     tree = html.parse(sp500_resp)
     root = tree.getroot()
-    trs = root.xpath('//table[@id="constituents"]/tbody/tr')
-    sp_500_tkrs = []
-    for _tr in trs:
-        sp_500_tkrs.append(
-            tuple(
-                d.text.replace("\n", "")
-                if d.text
-                else (
-                    d.xpath(".//a/text()")[0]
-                    if d.xpath(".//a/text()")
-                    else None
-                )
-                for d in _tr.findall("td")
-            )
-        )
-
+    cells = [
+        x.text_content().strip() or None
+        for x in cast(list[html.HtmlElement], sp_500_cells_xpath(root))
+    ]
     tks_site: list[tuple[Any, Any, Any]] = [
-        (x[0].lower().replace(".", "-"), x[-2], x[-3])
-        for x in sp_500_tkrs
-        if x
+        (str(tkr).lower().replace(".", "-"), cik, add_date)
+        for tkr, add_date, cik in zip(cells[::3], cells[1::3], cells[2::3])
     ]
     res = list(set(tks_site))
     res.sort(key=lambda x: cast(str, x[0]))
@@ -1041,21 +1348,18 @@ def get_sp_companies_ciks(cntlr: Cntlr) -> list[dict[str, Any]]:
     sp500 = get_sp_500(cntlr)
     sp100 = get_sp_100(cntlr)
 
-    sp500_dict_by_tkr = dict((tkr, (cik, xdate)) for tkr, cik, xdate in sp500)
-    sp500_dict_by_cik = {}
-    for tkr, cik, add_date in sp500:
-        sp500_dict_by_cik[cik] = (tkr, add_date)
-    sp100_dict_by_cik = defaultdict(set)
-    for tkr2 in sp100:
-        sp100_dict_by_cik[sp500_dict_by_tkr[tkr2][0]].add(tkr2)
+    sp500_dict_by_cik = {cik: (tkr, add_date) for tkr, cik, add_date in sp500}
+    sp500_cik_by_tkr = {tkr: cik for tkr, cik, _add_date in sp500}
+    sp100_ciks = {
+        sp500_cik_by_tkr[tkr] for tkr in sp100 if tkr in sp500_cik_by_tkr
+    }
 
+    today = datetime.datetime.today().date()
     result = [
         {
-            str(
-                SEC.SpCompaniesCiks.as_of_date.key
-            ): datetime.datetime.today().date(),
+            str(SEC.SpCompaniesCiks.as_of_date.key): today,
             str(SEC.SpCompaniesCiks.cik_number.key): cik,
-            str(SEC.SpCompaniesCiks.is_sp100.key): cik in sp100_dict_by_cik,
+            str(SEC.SpCompaniesCiks.is_sp100.key): cik in sp100_ciks,
             str(SEC.SpCompaniesCiks.ticker_symbol.key): tkr_date[0],
             str(SEC.SpCompaniesCiks.date_first_added.key): tkr_date[1],
         }
@@ -1066,8 +1370,7 @@ def get_sp_companies_ciks(cntlr: Cntlr) -> list[dict[str, Any]]:
         getattr(cntlr, "db_cache_dir"),
         getattr(SEC.SpCompaniesCiks, "__tablename__", "") + "-data.pkl",
     )
-    with open(store_filename, "wb") as pkl:
-        pickle.dump(result, pkl)
+    pickle_rows(result, store_filename)
     time_taken = get_time_elapsed(start_at)
     msg = (
         f"Retrieved S&P companies and updated cache ({store_filename})"
@@ -1077,15 +1380,157 @@ def get_sp_companies_ciks(cntlr: Cntlr) -> list[dict[str, Any]]:
     return result
 
 
-def pickle_table_data(engine: Engine, table_model: Any) -> str:
-    """Copy database table and pickle its date in cache folder"""
+def pickle_rows(
+    rows: Iterable[dict[str, Any]],
+    store_filename: str,
+    chunk_size: int = 10000,
+) -> int:
+    """Pickles rows to `store_filename` as a gzip compressed stream of lists
+    of at most `chunk_size` rows using pickle protocol 5, so that neither
+    writing nor reading has to build a single giant object
+    (see `iter_pickled_rows`), returns count of pickled rows"""
+    with gzip.open(store_filename, "wb", compresslevel=3) as pkl:
+        pickler = pickle.Pickler(pkl, protocol=5)
+        chunk: list[dict[str, Any]] = []
+        dumped_chunks = 0
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                pickler.dump(chunk)
+                pickler.clear_memo()
+                chunk = []
+                dumped_chunks += 1
+        if chunk or dumped_chunks == 0:
+            pickler.dump(chunk)
+    return dumped_chunks * chunk_size + len(chunk)
+
+
+def iter_pickled_rows(file_path: str) -> Iterator[dict[str, Any]]:
+    """Yields rows pickled by `pickle_rows` one chunk at a time, files
+    holding a single pickled list and uncompressed files are also
+    supported"""
+    with open(file_path, "rb", buffering=1 << 20) as raw_pkl:
+        pkl: Any = raw_pkl
+        is_gzip = raw_pkl.read(2) == gzip_magic
+        raw_pkl.seek(0)
+        if is_gzip:
+            pkl = gzip.GzipFile(fileobj=raw_pkl, mode="rb")
+        while True:
+            try:
+                chunk = pickle.load(pkl)
+            except EOFError:
+                break
+            yield from chunk
+
+
+def pickle_table_data(
+    engine: Engine, table_model: Any, chunk_size: int = 10000
+) -> str:
+    """Copy database table and pickle its date in cache folder, rows are
+    streamed from the database and pickled in lists of `chunk_size` rows
+    (see `pickle_rows`)"""
     store_filename: str = os.path.join(
         getattr(engine, "db_cache_dir"),
         table_model.__tablename__ + "-data.pkl",
     )
+    # resolve columns once instead of reflecting table columns per row
+    cols: list[str] = list(table_model.__table__.columns.keys())
+    cols_getter = attrgetter(*cols)
     with Session(engine) as session:
-        table_data = session.query(table_model)
-        table_data_dicts = [instance_to_dict(x) for x in table_data]
-        with open(store_filename, "wb") as pkl:
-            pickle.dump(table_data_dicts, pkl)
+        table_data = (
+            session.query(table_model)
+            .enable_eagerloads(False)
+            .yield_per(chunk_size)
+        )
+        pickle_rows(
+            (dict(zip(cols, cols_getter(row))) for row in table_data),
+            store_filename,
+            chunk_size,
+        )
+    return store_filename
+
+
+def update_pickle_table_data(
+    engine: Engine,
+    table_model: Any,
+    key_column: str,
+    changed_keys: set[Any],
+    chunk_size: int = 10000,
+) -> str:
+    """Refresh only rows whose `key_column` is in `changed_keys` in table
+    data pickled by `pickle_table_data`, other rows are copied from the
+    existing cache file, the whole table is pickled if there is no cache
+    file yet or if the refreshed cache does not match table rows count"""
+    store_filename: str = os.path.join(
+        getattr(engine, "db_cache_dir"),
+        table_model.__tablename__ + "-data.pkl",
+    )
+    if not os.path.isfile(store_filename):
+        return pickle_table_data(engine, table_model, chunk_size)
+    cols: list[str] = list(table_model.__table__.columns.keys())
+    cols_getter = attrgetter(*cols)
+    key_attr = getattr(table_model, key_column)
+
+    def changed_rows(session: Session) -> Iterator[dict[str, Any]]:
+        for keys in chunks(list(changed_keys), constants.QUERY_IN_CHUNK_SIZE):
+            for row in (
+                session.query(table_model)
+                .enable_eagerloads(False)
+                .filter(key_attr.in_(keys))
+            ):
+                yield dict(zip(cols, cols_getter(row)))
+
+    # hidden temp file, never picked up as a table cache file
+    tmp_fd, tmp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(store_filename), prefix="."
+    )
+    os.close(tmp_fd)
+    try:
+        with Session(engine) as session:
+            pickled_count = pickle_rows(
+                chain(
+                    (
+                        row
+                        for row in iter_pickled_rows(store_filename)
+                        if row[key_column] not in changed_keys
+                    ),
+                    changed_rows(session),
+                ),
+                tmp_filename,
+                chunk_size,
+            )
+            table_count = (
+                session.query(func.count())
+                .select_from(table_model)
+                .scalar()
+            )
+        if pickled_count != table_count:
+            # cache drifted from the table (interrupted run, older cache ...)
+            return pickle_table_data(engine, table_model, chunk_size)
+        os.replace(tmp_filename, store_filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
     return store_filename
+
+
+def pickle_tables_data(
+    engine: Engine, table_models: list[Any], max_workers: int | None = None
+) -> list[str]:
+    """Pickle several tables concurrently (see `pickle_table_data`),
+    returns cache files in the same order as `table_models`"""
+    with ThreadPoolExecutor(
+        max_workers=max_workers or max(len(table_models), 1)
+    ) as executor:
+        return list(
+            executor.map(
+                lambda table_model: pickle_table_data(engine, table_model),
+                table_models,
+            )
+        )
+
+
+def load_pickled_table_data(file_path: str) -> list[dict[str, Any]]:
+    """Loads table data pickled in cache folder, the file may contain one
+    or more pickled lists of rows (see `pickle_rows`)"""
+    return list(iter_pickled_rows(file_path))
@@ -2,34 +2,44 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import gettext
+import io
 import logging
 import os
-import pickle
 import sys
 import time
-from collections import defaultdict
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Any
-from typing import cast
 from typing import Literal
 
 from sqlalchemy import create_engine
+from sqlalchemy import bindparam
 from sqlalchemy import delete
+from sqlalchemy import event
 from sqlalchemy import func
 from sqlalchemy import insert
 from sqlalchemy import inspect
 from sqlalchemy import MetaData
+from sqlalchemy import select
+from sqlalchemy import Table
+from sqlalchemy import text
 from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.engine import Connection
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import Insert
 from xbrlreportsindexes.core import constants
 from xbrlreportsindexes.core.arelle_utils import CntlrPy
 from xbrlreportsindexes.core.arelle_utils import IndexDBLogHandler
 from xbrlreportsindexes.core.arelle_utils import RSS_DB_LOG_HANDLER_NAME
 from xbrlreportsindexes.core.constants import log_template
 from xbrlreportsindexes.core.constants import XIDBException
-from xbrlreportsindexes.core.data_utils import chunks
 from xbrlreportsindexes.core.data_utils import date_filter_feeds
 from xbrlreportsindexes.core.data_utils import get_feed_info
 from xbrlreportsindexes.core.data_utils import get_filer_information
@@ -41,6 +51,7 @@ from xbrlreportsindexes.core.data_utils import get_new_or_modified_filings
 from xbrlreportsindexes.core.data_utils import get_sec_cik_ticker_mapping
 from xbrlreportsindexes.core.data_utils import get_sp_companies_ciks
 from xbrlreportsindexes.core.data_utils import get_time_elapsed
+from xbrlreportsindexes.core.data_utils import load_pickled_table_data
 from xbrlreportsindexes.core.data_utils import ts_now
 from xbrlreportsindexes.model import BASE
 from xbrlreportsindexes.model import BASE_M
@@ -63,6 +74,60 @@ updatable_tables_functions = {
     getattr(SEC.SpCompaniesCiks, "__tablename__"): get_sp_companies_ciks,
 }
 
+# tables written to on every feed and log insert
+sec_feed_table: Table = BASE.metadata.tables[str(SEC.SecFeed.__tablename__)]
+sec_filing_table: Table = BASE.metadata.tables[
+    str(SEC.SecFiling.__tablename__)
+]
+sec_file_table: Table = BASE.metadata.tables[str(SEC.SecFile.__tablename__)]
+sec_filer_table: Table = BASE.metadata.tables[
+    str(SEC.SecFiler.__tablename__)
+]
+former_names_table: Table = BASE.metadata.tables[
+    str(SEC.SecFormerNames.__tablename__)
+]
+processing_log_table: Table = BASE.metadata.tables[
+    str(BASE_M.ProcessingLog.__tablename__)
+]
+action_log_table: Table = BASE.metadata.tables[
+    str(BASE_M.ActionLog.__tablename__)
+]
+
+# keys of feed dicts and sort keys of extracted filings and files
+feed_id_key: str = str(SEC.SecFeed.feed_id.key)
+feed_last_modified_date_key: str = str(SEC.SecFeed.last_modified_date.key)
+filing_pub_date_key: str = str(SEC.SecFiling.pub_date.key)
+file_id_key: str = str(SEC.SecFile.file_id.key)
+
+# location table rows from constants, built once
+location_rows: list[dict[str, Any]] = [
+    {
+        str(BASE_M.Location.code.key): k,
+        str(BASE_M.Location.latitude.key): v[2],
+        str(BASE_M.Location.longitude.key): v[3],
+        str(BASE_M.Location.country.key): v[0],
+        str(BASE_M.Location.state_province.key): v[1],
+        str(BASE_M.Location.location_fix.key): v[4],
+        str(BASE_M.Location.alpha_2.key): v[5],
+        str(BASE_M.Location.alpha_3.key): v[6],
+        str(BASE_M.Location.numeric.key): v[7],
+    }
+    for k, v in constants.STATE_CODES.items()
+]
+
+# set on every new sqlite connection
+sqlite_pragmas: list[str] = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+]
+
+# escapes of postgres COPY text format
+copy_text_escapes: dict[int, str] = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+
 
 def create_connection_args(
     user: str | None,
@@ -80,6 +145,15 @@ def create_connection_args(
             constants.ERR_BAD_CONN_PARAM,
             "At least database and product must be provided.",
         )
+    # connection pool of server backends, keeps connections alive
+    # between tasks and checks them before use
+    pool_args: dict[str, Any] = {
+        "pool_timeout": timeout,
+        "pool_size": int(os.environ.get(constants.DB_POOL_SIZE_ENV_VAR, 20)),
+        "max_overflow": 10,
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
+    }
     connection_strings: dict[str, dict[str, Any]] = {
         "sqlite": {
             "url": f"sqlite:///{database}",
@@ -88,12 +162,15 @@ def create_connection_args(
         "postgres": {
             "url": f"postgresql+psycopg2://"  # pg8000
             f"{user}:{password}@{host}:{port or 5432}/{database}",
-            "pool_timeout": timeout,
+            **pool_args,
+            # batch executemany inserts in pages of VALUES
+            "executemany_mode": "values_plus_batch",
+            "executemany_values_page_size": 1000,
         },
         "mysql": {
             "url": f"mysql+pymysql:"
             f"//{user}:{password}@{host}:{port or 3306}/{database}",
-            "pool_timeout": timeout,
+            **pool_args,
         },
         # "mssql": {
         #     "url": f"mssql+pymssql:"
@@ -106,6 +183,13 @@ def create_connection_args(
         #     "pool_timeout": timeout,
         # },
     }
+    if product == "sqlite" and database != ":memory:":
+        # keep sqlite file connections open between sessions instead of
+        # reopening the file for every task and feed (default NullPool)
+        connection_strings["sqlite"]["poolclass"] = QueuePool
+        connection_strings["sqlite"]["connect_args"][
+            "check_same_thread"
+        ] = False
     return connection_strings[product]
 
 
@@ -128,51 +212,149 @@ def create_connection_engine(
     engine: Engine = create_engine(
         **connection_str, future=True
     )  # type: ignore[call-overload]
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", set_sqlite_pragmas)
     return engine
 
 
+def set_sqlite_pragmas(dbapi_conn: Any, _connection_record: Any) -> None:
+    """Sets write ahead log and caching pragmas on new sqlite
+    connections, WAL keeps readers from blocking the single writer"""
+    cursor = dbapi_conn.cursor()
+    for pragma in sqlite_pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+@functools.lru_cache(maxsize=32)
+def table_insert_stmt(current_table: Table) -> Insert:
+    """Insert statement of table, built once per table so that
+    executemany inserts reuse the same statement (and its cache key)"""
+    return insert(current_table)
+
+
+def insert_ignore_stmt(current_table: Table, dialect_name: str) -> Insert:
+    """Insert statement that skips rows conflicting with existing primary
+    keys"""
+    stmt: Insert
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(current_table).on_conflict_do_nothing()
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(current_table).on_conflict_do_nothing()
+    else:
+        # mysql
+        stmt = insert(current_table).prefix_with("IGNORE")
+    return stmt
+
+
 def insert_or_delete_rows(
     conn: Connection,
     action: str,
     table_name: str,
     data: list[dict[str, Any]] | dict[str, Any] | None = None,
     commit: bool = False,
+    current_table: Table | None = None,
 ) -> int:
     """Helper function to insert or delete table contents
-    `action` should be on of `insert` or `delete`.
+    `action` should be on of `insert` or `delete`, `current_table` can be
+    given to skip looking up `table_name` in metadata.
     """
     rowcount = 0
     if action not in ("insert", "delete"):
         raise XIDBException(constants.ERR_UNKNOWN_ACTION)
-    if action == "insert" and data is None:
+    if action == "insert" and (data is None or data == {}):
         raise XIDBException(constants.ERR_MISSING_DATA)
-    current_table = BASE.metadata.tables[table_name]
-    stmts: list[delete | insert] = []
+    if action == "insert" and isinstance(data, list) and not data:
+        # nothing to insert, skip building and executing a statement
+        if commit:
+            conn.commit()  # type: ignore[attr-defined]
+        return rowcount
+    if current_table is None:
+        current_table = BASE.metadata.tables[table_name]
     if action == "insert":
         if isinstance(data, dict):
-            stmts.append(insert(current_table).values(**data))
+            cur = conn.execute(insert(current_table).values(**data))
+            rowcount += cur.rowcount
         elif isinstance(data, list):
-            chunked = chunks(data, 100)
-            for chunk in chunked:
-                stmts.append(insert(current_table).values(chunk))
+            # one statement with bound parameters executed for all rows,
+            # the dialect batches them (executemany), rowcount of
+            # executemany is not reliable for all drivers
+            conn.execute(table_insert_stmt(current_table), data)
+            rowcount += len(data)
     elif action == "delete":
-        stmts.append(delete(current_table))
-
-    for stmt in stmts:
-        cur = conn.execute(stmt)
-        rowcount += cur.rowcount
+        if conn.dialect.name == "postgresql" and not any(
+            fk.column.table is current_table
+            for table in BASE.metadata.tables.values()
+            for fk in table.foreign_keys
+        ):
+            # TRUNCATE skips per row work, but reports no rowcount and
+            # can't be used on tables referenced by foreign keys. mysql
+            # TRUNCATE commits implicitly, so it keeps using DELETE.
+            rowcount += conn.scalar(
+                select(func.count()).select_from(current_table)
+            )
+            preparer = conn.dialect.identifier_preparer
+            conn.execute(
+                text(f"TRUNCATE TABLE {preparer.format_table(current_table)}")
+            )
+        else:
+            cur = conn.execute(delete(current_table))
+            rowcount += cur.rowcount
     if commit:
         conn.commit()  # type: ignore[attr-defined]
     return rowcount
 
 
-def load_rss_feed(
-    link: str, cntlr: Cntlr | None = None, reload_cache: bool = True
-) -> ModelXbrl:
-    """Uses arelle Cntlr to load rss feed from the given link"""
-    if cntlr is None:
-        cntlr = CntlrPy()
-    # account for multiple processes trying to create same
+def copy_text_rows(
+    current_table: Table, data: list[dict[str, Any]]
+) -> tuple[list[str], io.StringIO]:
+    """Columns of `current_table` found in any row of `data`, and rows in
+    postgres COPY text format for these columns, missing values are NULL"""
+    keys: set[str] = set().union(*data)
+    cols: list[str] = [x for x in current_table.columns.keys() if x in keys]
+    buffer = io.StringIO()
+    for row in data:
+        buffer.write(
+            "\t".join(
+                "\\N"
+                if row.get(col) is None
+                else str(row[col]).translate(copy_text_escapes)
+                for col in cols
+            )
+        )
+        buffer.write("\n")
+    buffer.seek(0)
+    return cols, buffer
+
+
+def copy_rows_postgres(
+    conn: Connection, table_name: str, data: list[dict[str, Any]]
+) -> int:
+    """Bulk loads rows into a postgres table with `COPY ... FROM STDIN`
+    (text format) on the connection's current transaction (see
+    `copy_text_rows`)."""
+    if not data:
+        return 0
+    current_table = BASE.metadata.tables[table_name]
+    preparer = conn.dialect.identifier_preparer
+    cols, buffer = copy_text_rows(current_table, data)
+    copy_sql = (
+        f"COPY {preparer.format_table(current_table)} "
+        f"({', '.join(preparer.quote(col) for col in cols)}) FROM STDIN"
+    )
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+    return len(data)
+
+
+def cache_rss_feed(
+    cntlr: Cntlr, link: str, reload_cache: bool = True
+) -> None:
+    """Downloads rss feed from the given link into arelle web cache"""
+    # account for multiple processes (or threads) trying to create same
     # cache folder when cache is cleared
     while True:
         try:
@@ -184,23 +366,64 @@ def load_rss_feed(
             time.sleep(0.5)
             continue
         break
+
+
+def prefetch_rss_feeds(
+    cntlr: Cntlr,
+    feeds: list[dict[str, Any]],
+    reload_cache: bool = True,
+    max_workers: int = 8,
+) -> list[str]:
+    """Downloads rss feeds into arelle web cache concurrently, so that
+    feeds can be loaded one after the other from the cache without waiting
+    on the network. Returns links of successfully downloaded feeds."""
+    prefetched: list[str] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                cache_rss_feed,
+                cntlr,
+                feed["link"],
+                reload_cache or feed["is_last_month"],
+            ): feed["link"]
+            for feed in feeds
+        }
+        for future in as_completed(futures):
+            if future.exception() is None:
+                prefetched.append(futures[future])
+    return prefetched
+
+
+def load_rss_feed(
+    link: str, cntlr: Cntlr | None = None, reload_cache: bool = True
+) -> ModelXbrl:
+    """Uses arelle Cntlr to load rss feed from the given link"""
+    if cntlr is None:
+        cntlr = CntlrPy()
+    cache_rss_feed(cntlr, link, reload_cache)
     modelXbrl: ModelXbrl | None = None
     if sys.platform == "win32" and link.startswith("file:///"):
         link = link.replace("file:///", "")
     _fs = FileSource(link, cntlr)
 
-    # try to load for 20 secs
-    start_loop_time = time.perf_counter()
-    while not modelXbrl:
+    # retry failed loads with backoff (1, 2 secs) instead of busy looping
+    attempts = 3
+    for attempt in range(attempts):
         try:
             modelXbrl = cntlr.modelManager.load(_fs, "getting feed data")
-        except Exception:
-            pass
-        time_taken = get_time_elapsed(start_loop_time)
-        if time_taken >= 20 and modelXbrl is None:
+        except Exception as err:
+            cntlr.addToLog(
+                f"Failed to load rss feed {link} "
+                f"(attempt {attempt + 1} of {attempts}): {err}",
+                **log_template("error", cntlr, logging.ERROR),
+            )
+        if modelXbrl is not None:
             break
+        if attempt < attempts - 1:
+            time.sleep(2**attempt)
+    if modelXbrl is None:
+        raise XIDBException(constants.ERR_FEED_NOT_LOADED)
     cntlr.showStatus((f"Loaded rss feed and getting feed data from {link}"))
-    assert isinstance(modelXbrl, ModelXbrl)
     return modelXbrl
 
 
@@ -226,9 +449,14 @@ def refresh_table_data(
             )
             del_time_taken = get_time_elapsed(del_start_at)
             insert_start_at = time.perf_counter()
-            inserted_rows = insert_or_delete_rows(
-                conn, "insert", table_name, new_data, commit=False
-            )
+            if conn.dialect.name == "postgresql" and isinstance(
+                new_data, list
+            ):
+                inserted_rows = copy_rows_postgres(conn, table_name, new_data)
+            else:
+                inserted_rows = insert_or_delete_rows(
+                    conn, "insert", table_name, new_data, commit=False
+                )
             insert_time_taken = get_time_elapsed(insert_start_at)
         except Exception:
             conn.rollback()  # type: ignore[attr-defined]
@@ -298,32 +526,22 @@ def prep_initialization_data(
 
     allowed_tables = BASE.metadata.tables.keys()
     initialization_data = {}
-    pickles = {
-        x.split("-")[0]: os.path.join(getattr(cntlr, "db_cache_dir"), x)
-        # {table_name: file_path, ...}
-        for x in os.listdir(getattr(cntlr, "db_cache_dir"))
-        if x.split("-")[0] in allowed_tables
-    }
+    db_cache_dir: str = getattr(cntlr, "db_cache_dir")
+    pickles: dict[str, str] = {}  # {table_name: file_path, ...}
+    with os.scandir(db_cache_dir) as entries:
+        for entry in entries:
+            # only table cache files `<table>-data.pkl`
+            if not entry.is_file() or not entry.name.endswith("-data.pkl"):
+                continue
+            tablename = entry.name.split("-", 1)[0]
+            if tablename in allowed_tables:
+                pickles[tablename] = entry.path
     for tablename, file_path in pickles.items():
-        with open(file_path, "rb") as _pd:
-            initialization_data[tablename] = pickle.load(_pd)
+        initialization_data[tablename] = load_pickled_table_data(file_path)
     # add locations from constants
-    locs = BASE_M.Location
-    initialization_data[getattr(locs, "__tablename__")] = [
-        {
-            locs.code.key: k,
-            locs.latitude.key: v[2],
-            locs.longitude.key: v[3],
-            locs.country.key: v[0],
-            locs.state_province.key: v[1],
-            locs.location_fix.key: v[4],
-            locs.alpha_2.key: v[5],
-            locs.alpha_3.key: v[6],
-            locs.numeric.key: v[7],
-        }
-        for k, v in constants.STATE_CODES.items()
-    ]
-
+    initialization_data[
+        getattr(BASE_M.Location, "__tablename__")
+    ] = location_rows
     return initialization_data
 
 
@@ -333,10 +551,12 @@ def initialize_db(
     metadata: MetaData,
     initialization_data: dict[str, Any] | None = None,
     drop_first: bool = False,
+    existing_tables: set[str] | None = None,
 ) -> bool:
     """Creates model tables and inserts initialization data if available.
     If drop_first, drops all model tables first
     initialization_date is a dict {'table_name':[{row data}, ...]}
+    existing_tables (already inspected) are not checked for again.
     """
     result = False
 
@@ -347,21 +567,30 @@ def initialize_db(
         )
         metadata.drop_all(engine)
 
-    model_tables = set(metadata.tables.keys())
     cntlr.addToLog(
         ("Initializing database..."),
         **log_template("info", engine.url.database),
     )
 
-    metadata.create_all(engine)
-    inspector = inspect(engine)
-    existing_tables = set(inspector.get_table_names())
-    if len(model_tables - existing_tables) == 0:
-        result = True
-        cntlr.addToLog(
-            ("Tables created, populating initial tables..."),
-            **log_template("info", engine.url.database),
+    if existing_tables is not None and not drop_first:
+        # only create missing tables, without checking each table again
+        metadata.create_all(
+            engine,
+            tables=[
+                x
+                for x in metadata.sorted_tables
+                if x.name not in existing_tables
+            ],
+            checkfirst=False,
         )
+    else:
+        metadata.create_all(engine)
+    # create_all raises if any table could not be created
+    result = True
+    cntlr.addToLog(
+        ("Tables created, populating initial tables..."),
+        **log_template("info", engine.url.database),
+    )
     if result and initialization_data:
         # insert initialization data
         for tablename, table_data in initialization_data.items():
@@ -382,8 +611,7 @@ def verify_db(
     available to initialize tables.
     """
     result = True
-    inspector = inspect(engine)
-    existing_tables = set(inspector.get_table_names())
+    existing_tables = set(inspect(engine).get_table_names())
     model_tables = set(metadata.tables.keys())
     diff_in_tables = model_tables - existing_tables
     len_diff_in_tables = len(diff_in_tables)
@@ -407,7 +635,12 @@ def verify_db(
             for _t in constants.CACHED_CORE_TABLES:
                 initialization_data.pop(_t, None)
         result = initialize_db(
-            cntlr, engine, metadata, initialization_data, reinitialize
+            cntlr,
+            engine,
+            metadata,
+            initialization_data,
+            reinitialize,
+            existing_tables,
         )
     elif len_diff_in_tables > 0 and not initialize:
         cntlr.addToLog(
@@ -493,9 +726,11 @@ def prep_monthly_feeds_to_process(
     to_date: str | None = None,
     include_latest: bool = True,
     loc: str | None = None,
+    engine: Engine | None = None,
 ) -> list[dict[str, Any]]:
     """Get and sort out SEC XBRL monthly rss feeds to update
-    (https://www.sec.gov/Archives/edgar/monthly/)"""
+    (https://www.sec.gov/Archives/edgar/monthly/), if `engine` is given
+    modified feeds get their last filing_id in the database"""
     result: list[Any] = []
     start_time = time.perf_counter()
     _feeds: list[dict[str, Any]] = []
@@ -526,6 +761,29 @@ def prep_monthly_feeds_to_process(
         **log_template(constants.TSK_NEW_OR_MODIFIED_FEEDS, cntlr),
         refs=[{"time": time_taken, "count": len(new_and_modified_feeds)}],
     )
+    modified_feeds = [
+        x for x in new_and_modified_feeds if x["new_or_modified"] == "modified"
+    ]
+    if engine is not None and modified_feeds:
+        # one grouped query instead of one per modified feed
+        with Session(engine) as session:
+            last_filing_ids: dict[Any, int] = {
+                feed_id: last_filing_id
+                for feed_id, last_filing_id in session.execute(
+                    select(
+                        SEC.SecFiling.feed_id,
+                        func.max(SEC.SecFiling.filing_id),
+                    )
+                    .where(
+                        SEC.SecFiling.feed_id.in_(
+                            [x[feed_id_key] for x in modified_feeds]
+                        )
+                    )
+                    .group_by(SEC.SecFiling.feed_id)
+                )
+            }
+        for feed in modified_feeds:
+            feed["last_filing_id"] = last_filing_ids.get(feed[feed_id_key])
     return new_and_modified_feeds
 
 
@@ -539,33 +797,35 @@ def load_and_prep_feed(
     is_modified = feed["new_or_modified"] == "modified"
     is_new = feed["new_or_modified"] == "new"
     is_latest = feed["link"] == constants.LATEST_FEEDS_URL
-    if feed["is_last_month"]:  # make sure we reload_cache for last feed
+    if feed["is_last_month"] and not feed.get("is_prefetched"):
+        # make sure we reload_cache for last feed
         reload_cache = True
     modelXbrl = load_rss_feed(feed["link"], cntlr, reload_cache=reload_cache)
     if not modelXbrl:
         raise XIDBException(constants.ERR_FEED_NOT_LOADED)
     feed_data, modelDoc = get_feed_info(
-        modelXbrl, feed[str(SEC.SecFeed.last_modified_date.key)]
+        modelXbrl, feed[feed_last_modified_date_key]
     )
     feed_id = feed_data["feed_id"]
     # assumes we will not have more than 100,000 filing a month ...
     initial_filing_id = int(str(feed_id) + "100001")
     if is_modified or is_latest:
-        # get last filing_id for this feed in the db
-        with Session(engine) as session:
-            last_feed_id = (
-                session.query(func.max(SEC.SecFiling.filing_id))
-                .where(
-                    SEC.SecFiling.feed_id == feed_id
-                )  # pylint: disable=W0143
-                .all()
-            )
-            last_feed_id_ = last_feed_id[0][0]
-            initial_filing_id = (
-                last_feed_id_ + 1
-                if isinstance(last_feed_id_, int) and last_feed_id_ is not None
-                else initial_filing_id
-            )
+        # get last filing_id for this feed in the db, unless already
+        # found while preparing feeds (prep_monthly_feeds_to_process)
+        if "last_filing_id" in feed:
+            last_feed_id_ = feed["last_filing_id"]
+        else:
+            with Session(engine) as session:
+                last_feed_id_ = session.scalar(
+                    select(func.max(SEC.SecFiling.filing_id)).where(
+                        SEC.SecFiling.feed_id == feed_id
+                    )  # pylint: disable=W0143
+                )
+        initial_filing_id = (
+            last_feed_id_ + 1
+            if isinstance(last_feed_id_, int)
+            else initial_filing_id
+        )
     new_or_modified_filings = get_new_or_modified_filings(
         engine, feed_id, modelDoc, is_modified
     )
@@ -588,25 +848,21 @@ def extract_filings_data_from_rss_items(
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     """Extracts filing information from rss item created from loading
     an SEC XBRL rss feed"""
-    filing_id = initial_filing_id
-    filings_list = []
+    filings_list = [
+        get_filing_info(rss_item, feed_id, filing_id)
+        for filing_id, rss_item in enumerate(
+            new_or_modified_filings, initial_filing_id
+        )
+    ]
     files_list = []
-    count_of_feed_files = 0
-    for rss_item in new_or_modified_filings:
-        filing_info_dict = get_filing_info(rss_item, feed_id, filing_id)
-        files_info_list = get_files_info(rss_item, feed_id, filing_id)
-        count_of_feed_files += len(files_info_list)
-        filings_list.append(filing_info_dict)
-        files_list.extend(files_info_list)
-        filing_id += 1
+    for filing_id, rss_item in enumerate(
+        new_or_modified_filings, initial_filing_id
+    ):
+        files_list.extend(get_files_info(rss_item, feed_id, filing_id))
     # add the difference then at the end mark duplicates if
     # any (duplicates occur due to changes made after month end)
-    filings_list.sort(
-        key=lambda x: cast(
-            datetime.datetime, x[str(SEC.SecFiling.pub_date.key)]
-        )
-    )
-    files_list.sort(key=lambda x: cast(int, x[str(SEC.SecFile.file_id.key)]))
+    filings_list.sort(key=itemgetter(filing_pub_date_key))
+    files_list.sort(key=itemgetter(file_id_key))
     return filings_list, files_list
 
 
@@ -616,15 +872,16 @@ def insert_feed_into_db(
     filings_to_insert: list[dict[str, Any]],
     files_to_insert: list[dict[str, Any]],
     is_modified: bool,
-) -> defaultdict[int, list[Any]]:
-    """Insert prepared feed data into database"""
-    stats: defaultdict[int, list[Any]] = defaultdict(list)
+) -> dict[int, list[Any]]:
+    """Insert prepared feed data into database, stats rows are recorded
+    as committed since they are only returned if the transaction is"""
+    feed_stats: list[Any] = []
     feed_id = feed_data["feed_id"]
-    feed_table = BASE.metadata.tables[str(SEC.SecFeed.__tablename__)]
-    filing_table = BASE.metadata.tables[str(SEC.SecFiling.__tablename__)]
-    file_table = BASE.metadata.tables[str(SEC.SecFile.__tablename__)]
+    feed_table = sec_feed_table
+    filing_table = sec_filing_table
+    file_table = sec_file_table
     is_latest = feed_data["feed_link"] == constants.LATEST_FEEDS_URL
-    with engine.connect() as conn1:
+    with engine.begin() as conn1:
         if not is_latest:
             if is_modified:
                 update_feed_stmt = (
@@ -635,7 +892,7 @@ def insert_feed_into_db(
                 feed_update_start = time.perf_counter()
                 cur1 = conn1.execute(update_feed_stmt)
                 feed_insert_time = get_time_elapsed(feed_update_start)
-                stats[feed_id].append(
+                feed_stats.append(
                     (
                         ts_now("utc"),
                         feed_id,
@@ -643,16 +900,20 @@ def insert_feed_into_db(
                         "update",
                         cur1.rowcount,
                         feed_insert_time,
-                        False,
+                        True,
                     )
                 )
             else:
                 feed_insert_start = time.perf_counter()
                 rowcount_1 = insert_or_delete_rows(
-                    conn1, "insert", feed_table.name, feed_data
+                    conn1,
+                    "insert",
+                    feed_table.name,
+                    feed_data,
+                    current_table=feed_table,
                 )
                 feed_insert_time = get_time_elapsed(feed_insert_start)
-                stats[feed_id].append(
+                feed_stats.append(
                     (
                         ts_now("utc"),
                         feed_id,
@@ -660,16 +921,20 @@ def insert_feed_into_db(
                         "insert",
                         rowcount_1,
                         feed_insert_time,
-                        False,
+                        True,
                     )
                 )
         if len(filings_to_insert) > 0:
             filing_insert_start = time.perf_counter()
             rowcount_2 = insert_or_delete_rows(
-                conn1, "insert", filing_table.name, filings_to_insert
+                conn1,
+                "insert",
+                filing_table.name,
+                filings_to_insert,
+                current_table=filing_table,
             )
             filing_insert_time = get_time_elapsed(filing_insert_start)
-            stats[feed_id].append(
+            feed_stats.append(
                 (
                     ts_now("utc"),
                     feed_id,
@@ -677,16 +942,20 @@ def insert_feed_into_db(
                     "insert",
                     rowcount_2,
                     filing_insert_time,
-                    False,
+                    True,
                 )
             )
         if len(files_to_insert) > 0:
             file_insert_start = time.perf_counter()
             rowcount_3 = insert_or_delete_rows(
-                conn1, "insert", file_table.name, files_to_insert
+                conn1,
+                "insert",
+                file_table.name,
+                files_to_insert,
+                current_table=file_table,
             )
             file_insert_time = get_time_elapsed(file_insert_start)
-            stats[feed_id].append(
+            feed_stats.append(
                 (
                     ts_now("utc"),
                     feed_id,
@@ -694,26 +963,24 @@ def insert_feed_into_db(
                     "insert",
                     rowcount_3,
                     file_insert_time,
-                    False,
+                    True,
                 )
             )
         commit_start = time.perf_counter()
-        conn1.commit()  # type: ignore[attr-defined]
-        commit_time = get_time_elapsed(commit_start)
-        stats[feed_id].append(
-            (
-                ts_now("utc"),
-                feed_id,
-                None,
-                "commit-update-insert-feed-data",
-                None,
-                commit_time,
-                True,
-            )
+    # single transaction committed on leaving engine.begin()
+    commit_time = get_time_elapsed(commit_start)
+    feed_stats.append(
+        (
+            ts_now("utc"),
+            feed_id,
+            None,
+            "commit-update-insert-feed-data",
+            None,
+            commit_time,
+            True,
         )
-        for i, _t in enumerate(stats[feed_id]):
-            stats[feed_id][i] = _t[:-1] + (True,)
-    return stats
+    )
+    return {feed_id: feed_stats}
 
 
 def insert_log(
@@ -721,8 +988,10 @@ def insert_log(
     engine: Engine,
     clear_buffer: bool = False,
     task_id: int | None = None,
+    min_batch: int = 0,
 ) -> tuple[list[Any], list[Any]]:
-    """Insert logs in log buffer from rss-db-log-handler"""
+    """Insert logs in log buffer from rss-db-log-handler, nothing is
+    inserted while the buffer holds fewer than `min_batch` records"""
     processing_log: list[Any] = []
     action_log: list[Any] = []
     log_buffer = None
@@ -735,29 +1004,28 @@ def insert_log(
             log_buffer = getattr(_handler, "logRecordBuffer")
             break
     assert isinstance(handler, IndexDBLogHandler)
-    if log_buffer is not None and len(log_buffer) > 0:
+    if log_buffer is not None and len(log_buffer) >= max(min_batch, 1):
         processing_log, action_log = handler.get_log_records()
-        with engine.connect() as conn:
-            if len(processing_log) > 0:
-                for p_r in processing_log:
-                    p_r["task_id"] = task_id
-                insert_or_delete_rows(
-                    conn,
-                    "insert",
-                    getattr(BASE_M.ProcessingLog, "__tablename__"),
-                    processing_log,
-                    True,
-                )
-            if len(action_log) > 0:
-                for a_r in action_log:
-                    a_r["task_id"] = task_id
-                insert_or_delete_rows(
-                    conn,
-                    "insert",
-                    getattr(BASE_M.ActionLog, "__tablename__"),
-                    action_log,
-                    True,
-                )
+        processing_log = [
+            {**p_r, "task_id": task_id} for p_r in processing_log
+        ]
+        action_log = [{**a_r, "task_id": task_id} for a_r in action_log]
+        # both logs are inserted in one transaction
+        with engine.begin() as conn:
+            insert_or_delete_rows(
+                conn,
+                "insert",
+                processing_log_table.name,
+                processing_log,
+                current_table=processing_log_table,
+            )
+            insert_or_delete_rows(
+                conn,
+                "insert",
+                action_log_table.name,
+                action_log,
+                current_table=action_log_table,
+            )
         if clear_buffer:
             handler.clearLogBuffer()
     return processing_log, action_log
@@ -771,44 +1039,110 @@ def update_filer_information(
     url: str | None = None,
 ) -> tuple[bool, str | None]:
     """Get SEC filer information from SEC website"""
-    filer_info = {}
     try:
-        _filer_info = get_filer_information(cntlr, cik, 5, url)
-        filer_info = _filer_info["filer"]
+        filer_info = get_filer_information(cntlr, cik, 5, url)
     except Exception as err:
-        cntlr.addToLog(
-            f"Could not get information for cik number: {cik}",
-            **log_template("error", engine.url.database),
-        )
-        return False, f"cik:{cik}|" + str(err)
+        return filer_information_failed(engine, cntlr, cik, err)
+    return save_filer_information(engine, cik, is_existing, filer_info)
+
+
+def filer_information_failed(
+    engine: Engine, cntlr: Cntlr, cik: str, err: Exception
+) -> tuple[bool, str | None]:
+    """Logs and returns stats of failure to get filer information"""
+    cntlr.addToLog(
+        f"Could not get information for cik number: {cik}",
+        **log_template("error", engine.url.database),
+    )
+    return False, f"cik:{cik}|" + str(err)
+
+
+def save_filers_information(
+    engine: Engine, is_existing: bool, filers_info: list[dict[str, Any]]
+) -> None:
+    """Insert or update a batch of filers information retrieved by
+    `get_filer_information` in one transaction, raises if any fails"""
+    former_names_rows = [
+        {
+            "cik_number": x["cik"],
+            "date_changed": y["date_changed"],
+            "name": y["name"],
+        }
+        for x in filers_info
+        for y in x["filer"]["former_names"]
+        if y["date_changed"] and y["name"]
+    ]
+    with engine.begin() as conn:
+        if is_existing:
+            conn.execute(
+                update(sec_filer_table)
+                .where(sec_filer_table.c.cik_number == bindparam("b_cik"))
+                .values(conformed_name=bindparam("b_conformed_name")),
+                [
+                    {
+                        "b_cik": x["cik"],
+                        "b_conformed_name": x["filer"]["conformed_name"],
+                    }
+                    for x in filers_info
+                ],
+            )
+        else:
+            conn.execute(
+                table_insert_stmt(sec_filer_table),
+                [
+                    {
+                        k: v
+                        for k, v in x["filer"].items()
+                        if k != "former_names"
+                    }
+                    for x in filers_info
+                ],
+            )
+        if former_names_rows:
+            # former names already in the database are skipped
+            conn.execute(
+                insert_ignore_stmt(former_names_table, engine.dialect.name),
+                former_names_rows,
+            )
+
+
+def save_filer_information(
+    engine: Engine,
+    cik: str,
+    is_existing: bool,
+    _filer_info: dict[str, Any],
+) -> tuple[bool, str | None]:
+    """Insert or update filer information retrieved by
+    `get_filer_information`"""
+    filer_info = _filer_info["filer"]
     try:
         with Session(engine) as session:
             if is_existing:
-                filer: Any = (
-                    session.query(SEC.SecFiler)
-                    .filter(SEC.SecFiler.cik_number == cik)
-                    .first()
+                # update without loading the filer and its relationships
+                session.execute(
+                    update(SEC.SecFiler)
+                    .where(SEC.SecFiler.cik_number == cik)
+                    .values(conformed_name=filer_info["conformed_name"])
+                    .execution_options(synchronize_session=False)
                 )
-                filer.conformed_name = filer_info["conformed_name"]
-                existing_former_names_tuples = {
-                    (x.date_changed, x.name) for x in filer.former_names
-                }
-                new_former_names_dicts = filer_info["former_names"]
-                unique_new_former_names_tuples = {
-                    (x["date_changed"], x["name"])
-                    for x in new_former_names_dicts
+                # former names already in the database are skipped by the
+                # database instead of being selected and diffed here
+                new_former_names_rows = [
+                    {
+                        "cik_number": cik,
+                        "date_changed": x["date_changed"],
+                        "name": x["name"],
+                    }
+                    for x in filer_info["former_names"]
                     if x["date_changed"] and x["name"]
-                }
-                former_names_to_append = [
-                    SEC.SecFormerNames(  # type: ignore[call-arg]
-                        cik_number=cik, date_changed=x[0], name=x[1]
-                    )
-                    for x in (
-                        unique_new_former_names_tuples
-                        - existing_former_names_tuples
-                    )
                 ]
-                filer.former_names.extend(former_names_to_append)
+                if new_former_names_rows:
+                    session.execute(
+                        insert_ignore_stmt(
+                            former_names_table, engine.dialect.name
+                        ),
+                        new_former_names_rows,
+                    )
             else:
                 former_names_dicts = filer_info.pop("former_names", [])
                 if former_names_dicts:
@@ -13,35 +13,51 @@ from __future__ import annotations
 
 import datetime
 import gettext
+import hashlib
 import json
 import logging
 import os
 import pathlib
+import shutil
 import time
-from io import BytesIO
+from collections import deque
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import as_completed
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from itertools import islice
+from operator import attrgetter
 from typing import Any
 from typing import Literal
+from urllib.error import HTTPError
 
 import pytz
 from dateutil import parser
-from distutils import dir_util
 from lxml import etree
 from sqlalchemy import and_
+from sqlalchemy import any_
+from sqlalchemy import bindparam
 from sqlalchemy import cast
 from sqlalchemy import Date
+from sqlalchemy import DateTime
 from sqlalchemy import func
+from sqlalchemy import inspect
 from sqlalchemy import MetaData
 from sqlalchemy import not_
 from sqlalchemy import or_
+from sqlalchemy import select
 from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm import Query
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import exists
 from sqlalchemy.sql import false
-from sqlalchemy.sql import label
-from sqlalchemy.sql import operators
+from sqlalchemy.sql import literal
 from xbrlreportsindexes.core import constants
 from xbrlreportsindexes.core.arelle_utils import CntlrPy
 from xbrlreportsindexes.core.arelle_utils import IndexDBLogHandler
@@ -51,21 +67,33 @@ from xbrlreportsindexes.core.data_utils import chunks
 from xbrlreportsindexes.core.data_utils import extract_esef_entity_lei_info
 from xbrlreportsindexes.core.data_utils import get_esef_all_filing_info
 from xbrlreportsindexes.core.data_utils import get_esef_filings_index
+from xbrlreportsindexes.core.data_utils import get_filer_information
 from xbrlreportsindexes.core.data_utils import get_time_elapsed
 from xbrlreportsindexes.core.data_utils import infer_esef_filing_language
-from xbrlreportsindexes.core.data_utils import pickle_table_data
+from xbrlreportsindexes.core.data_utils import is_feed_cached
+from xbrlreportsindexes.core.data_utils import load_cached_feed
+from xbrlreportsindexes.core.data_utils import parse_feed_date
+from xbrlreportsindexes.core.data_utils import pickle_tables_data
+from xbrlreportsindexes.core.data_utils import prefetch_esef_entities_isins
+from xbrlreportsindexes.core.data_utils import split_csv
+from xbrlreportsindexes.core.data_utils import store_cached_feed
+from xbrlreportsindexes.core.data_utils import TokenBucket
 from xbrlreportsindexes.core.data_utils import truncate_string
 from xbrlreportsindexes.core.data_utils import ts_now
+from xbrlreportsindexes.core.data_utils import update_pickle_table_data
 from xbrlreportsindexes.core.db_utils import create_connection_engine
 from xbrlreportsindexes.core.db_utils import (
     extract_filings_data_from_rss_items,
 )
+from xbrlreportsindexes.core.db_utils import filer_information_failed
 from xbrlreportsindexes.core.db_utils import insert_feed_into_db
 from xbrlreportsindexes.core.db_utils import insert_log
 from xbrlreportsindexes.core.db_utils import load_and_prep_feed
+from xbrlreportsindexes.core.db_utils import prefetch_rss_feeds
 from xbrlreportsindexes.core.db_utils import prep_monthly_feeds_to_process
 from xbrlreportsindexes.core.db_utils import refresh_updatable_tables
-from xbrlreportsindexes.core.db_utils import update_filer_information
+from xbrlreportsindexes.core.db_utils import save_filer_information
+from xbrlreportsindexes.core.db_utils import save_filers_information
 from xbrlreportsindexes.core.db_utils import verify_db
 from xbrlreportsindexes.model import BASE
 from xbrlreportsindexes.model import BASE_M
@@ -85,11 +113,53 @@ except ModuleNotFoundError as exc:
     raise Exception("Please add path to arelle to python path") from exc
 
 
+def get_cache_files_digest(
+    cache_dir: pathlib.Path, rel_paths: Sequence[pathlib.PurePath]
+) -> str:
+    """Digest of name, size and modification time of cache files"""
+    digest = hashlib.blake2b(digest_size=16)
+    for rel_path in rel_paths:
+        try:
+            stat = cache_dir.joinpath(rel_path).stat()
+        except FileNotFoundError:
+            file_sig = f"{rel_path.as_posix()}:missing"
+        else:
+            file_sig = (
+                f"{rel_path.as_posix()}:{stat.st_size}:{stat.st_mtime_ns}"
+            )
+        digest.update(file_sig.encode())
+    return digest.hexdigest()
+
+
+def copy_cache_files(
+    src_dir: pathlib.Path,
+    dst_dir: pathlib.Path,
+    rel_paths: Sequence[pathlib.PurePath],
+    max_workers: int | None = None,
+) -> None:
+    """Copies cache files concurrently, keeping modification times"""
+    for parent in {x.parent for x in rel_paths}:
+        dst_dir.joinpath(parent).mkdir(parents=True, exist_ok=True)
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                shutil.copy2, src_dir.joinpath(x), dst_dir.joinpath(x)
+            )
+            for x in rel_paths
+        ]
+        for future in as_completed(futures):
+            # propagate copy errors
+            future.result()
+
+
 def initialize_cache_dir(
     user_app_dir: pathlib.Path, is_test: bool = False
 ) -> pathlib.Path:
     """Create a copy of source cache in arelle cache dir, or return
-    source cache dir if testing.
+    source cache dir if testing, copy is skipped if the existing copy
+    is identical to source cache.
     """
     dir_name: pathlib.Path | None = None
     this_dir: pathlib.Path = pathlib.Path(__file__).parent
@@ -102,12 +172,23 @@ def initialize_cache_dir(
         dir_name = path_to_cache
     else:
         # use/create cache in arelle cache folder
-        if index_db_cache_dir.is_dir():
-            index_db_cache_dir.rmdir()
-        index_db_cache_dir.mkdir()
-        dir_util.copy_tree(
-            path_to_cache.as_posix(), index_db_cache_dir.as_posix()
+        rel_paths = sorted(
+            x.relative_to(path_to_cache)
+            for x in path_to_cache.rglob("*")
+            if x.is_file()
         )
+        if get_cache_files_digest(
+            index_db_cache_dir, rel_paths
+        ) != get_cache_files_digest(path_to_cache, rel_paths):
+            if index_db_cache_dir.is_dir():
+                # drop files that are not in source cache anymore, feeds
+                # and responses caches sub folders are kept
+                cache_files = {x.name for x in rel_paths if len(x.parts) == 1}
+                for x in index_db_cache_dir.iterdir():
+                    if x.is_file() and x.name not in cache_files:
+                        x.unlink()
+            # copies are not hardlinked, cache files are rewritten in place
+            copy_cache_files(path_to_cache, index_db_cache_dir, rel_paths)
         dir_name = index_db_cache_dir
     assert isinstance(dir_name, pathlib.Path)
     return dir_name
@@ -123,6 +204,9 @@ class XbrlIndexDB:
     engine: Engine
     current_task_tracker: BASE_M.TaskTracker | None
     tracker_session: Session | None
+    _tracker_pending_advances: int
+    _tracker_last_commit: float
+    _tracker_notes: deque[str]
     db_cache_dir: pathlib.Path | None
     _db_mock_test_data_dir: pathlib.Path | None
     is_test: bool
@@ -188,6 +272,26 @@ class XbrlIndexDB:
         self.db_exists = False
         self.current_task_tracker = None
         self.tracker_session = None
+        self._tracker_pending_advances = 0
+        self._tracker_last_commit = time.monotonic()
+        self._tracker_notes = deque(maxlen=constants.TRACKER_NOTES_MAX)
+        self._last_progress_print = 0.0
+        self._sec_limiter = TokenBucket(
+            constants.SEC_MAX_REQUESTS_PER_SECOND,
+            constants.SEC_MAX_REQUESTS_PER_SECOND,
+        )
+        self._esef_limiter = TokenBucket(
+            constants.ESEF_MAX_REQUESTS_PER_SECOND,
+            constants.ESEF_MAX_REQUESTS_PER_SECOND,
+        )
+        # shared by lei records and isins requests
+        self._gleif_limiter = TokenBucket(
+            constants.GLEIF_MAX_REQUESTS_PER_SECOND,
+            constants.GLEIF_MAX_REQUESTS_PER_SECOND,
+        )
+        self._industry_tree_codes_cache: dict[
+            tuple[tuple[int, ...], str], tuple[int, ...]
+        ] = {}
         self.verify_initialize_database()
 
     @classmethod
@@ -237,6 +341,9 @@ class XbrlIndexDB:
         )
         time_taken = get_time_elapsed(start_time)
         self.db_exists = db_exists
+        if initialize or reinitialize:
+            # industries may have been (re)loaded
+            self._industry_tree_codes_cache.clear()
         msg = (
             "Verified/Initialized "
             if db_exists
@@ -255,14 +362,16 @@ class XbrlIndexDB:
         return db_exists
 
     def insert_log(
-        self, clear_buffer: bool = True
+        self, clear_buffer: bool = True, min_batch: int = 0
     ) -> tuple[list[Any], list[Any]]:
-        """Insert log buffer into db"""
+        """Insert log buffer into db, waits for at least `min_batch`
+        records, feed steps batch their logs this way and the remainder is
+        flushed at the end of each feed by `insert_feed_data`"""
         task_id = None
         if self.current_task_tracker is not None:
             task_id = int(self.current_task_tracker.task_id)
         processing_log_rows, action_log_rows = insert_log(
-            self.cntlr, self.engine, clear_buffer, task_id
+            self.cntlr, self.engine, clear_buffer, task_id, min_batch
         )
         return processing_log_rows, action_log_rows
 
@@ -283,6 +392,7 @@ class XbrlIndexDB:
             to_date=to_date,
             include_latest=include_latest,
             loc=loc,
+            engine=self.engine,
         )
         _x, _y = self.insert_log()
         return new_and_modified_feeds
@@ -295,11 +405,7 @@ class XbrlIndexDB:
                 SEC.SecFeed.feed_id, SEC.SecFeed.last_modified_date
             ).all()
             existing_feeds_dict = {
-                x[0]: parser.parse(
-                    x[1], tzinfos={"EST": "UTC-5:00", "EDT": "UTC-4:00"}
-                )
-                if isinstance(x[1], str)
-                else x[1]
+                x[0]: parse_feed_date(x[1]) if isinstance(x[1], str) else x[1]
                 for x in existing_feeds
             }
         return existing_feeds_dict
@@ -328,8 +434,11 @@ class XbrlIndexDB:
         )
         time_taken = get_time_elapsed(start_time)
         self.cntlr.addToLog(
-            f"Found {len(new_or_modified_filings)} "
-            f"new or modified filings in {time_taken} sec(s).",
+            "Found %(count)s new or modified filings in %(time)s sec(s).",
+            messageArgs={
+                "count": len(new_or_modified_filings),
+                "time": time_taken,
+            },
             **log_template(
                 constants.TSK_NEW_OR_MODIFIED_FILINGS, feed_data["feed_link"]
             ),
@@ -343,7 +452,9 @@ class XbrlIndexDB:
         )
 
         if log_to_db:
-            _x, _y = self.insert_log()
+            _x, _y = self.insert_log(
+                min_batch=constants.LOG_INSERT_BATCH_SIZE
+            )
 
         return (
             feed_data,
@@ -371,8 +482,8 @@ class XbrlIndexDB:
         )
         time_taken = get_time_elapsed(start_time)
         self.cntlr.addToLog(
-            f"Retrieved data of {len(filings_list)} "
-            f"filings in {time_taken} sec(s).",
+            "Retrieved data of %(count)s filings in %(time)s sec(s).",
+            messageArgs={"count": len(filings_list), "time": time_taken},
             **log_template(
                 constants.TSK_GET_FEED_DATA, feed_data["feed_link"]
             ),
@@ -386,7 +497,9 @@ class XbrlIndexDB:
         )
 
         if log_to_db:
-            _x, _y = self.insert_log()
+            _x, _y = self.insert_log(
+                min_batch=constants.LOG_INSERT_BATCH_SIZE
+            )
 
         return filings_list, files_list
 
@@ -410,7 +523,8 @@ class XbrlIndexDB:
         time_taken = get_time_elapsed(db_insert_start)
         feed_id_msg = "latest filings feed" if is_latest else f"feed {feed_id}"
         self.cntlr.addToLog(
-            f"Finished insert of {feed_id_msg} in {time_taken} sec(s).",
+            "Finished insert of %(feed)s in %(time)s sec(s).",
+            messageArgs={"feed": feed_id_msg, "time": time_taken},
             **log_template(
                 constants.TSK_FEED_DB_INSERT, feed_data["feed_link"]
             ),
@@ -418,7 +532,9 @@ class XbrlIndexDB:
         )
 
         if log_to_db:
-            _x, _y = self.insert_log()
+            _x, _y = self.insert_log(
+                min_batch=constants.LOG_INSERT_BATCH_SIZE
+            )
 
         if insert_update_stats:
             result = insert_update_stats[feed_id]
@@ -426,13 +542,46 @@ class XbrlIndexDB:
         return result
 
     def insert_feed_data(
-        self, feed_data_dict: dict[str, Any], reload_cache: bool = True
+        self,
+        feed_data_dict: dict[str, Any],
+        reload_cache: bool = True,
+        use_feed_cache: bool = True,
     ) -> tuple[bool, list[Any] | Exception | None]:
         """Wrapper for the whole process of load,
-        extract and insert feed data"""
+        extract and insert feed data, new monthly feeds already extracted
+        are loaded from feeds cache if `use_feed_cache`"""
         modelXbrl = None
+        # only new feeds are cached, extracted data of modified feeds
+        # depends on filings already in db
+        use_feed_cache = (
+            use_feed_cache and feed_data_dict["new_or_modified"] == "new"
+        )
+        feed_link = feed_data_dict["link"]
+        last_modified_date = feed_data_dict["last_modified_date"]
         if self.db_exists:
             try:
+                cached_feed = (
+                    load_cached_feed(self.cntlr, feed_link, last_modified_date)
+                    if use_feed_cache
+                    else None
+                )
+                if cached_feed is not None:
+                    feed_data, filings_list, files_list = cached_feed
+                    self.cntlr.addToLog(
+                        f"Loaded data of {len(filings_list)} "
+                        "filings from feeds cache.",
+                        **log_template(constants.TSK_GET_FEED_DATA, feed_link),
+                    )
+                    stats = self._insert_feed_into_db(
+                        feed_data,
+                        feed_data["feed_id"],
+                        False,
+                        filings_list,
+                        files_list,
+                        False,
+                    )
+                    _x, _y = self.insert_log(True)
+                    return True, stats
                 (
                     feed_data,
                     feed_id,
@@ -460,6 +609,15 @@ class XbrlIndexDB:
                     files_list,
                     is_modified,
                 )
+                if use_feed_cache:
+                    store_cached_feed(
+                        self.cntlr,
+                        feed_link,
+                        last_modified_date,
+                        feed_data,
+                        filings_list,
+                        files_list,
+                    )
                 # clean up
                 modelXbrl.close()
                 self.cntlr.modelManager.close(modelXbrl)
@@ -471,6 +629,8 @@ class XbrlIndexDB:
                     modelXbrl.close()
                     self.cntlr.modelManager.close(modelXbrl)
                     del modelXbrl
+                # flush the failed feed's logs now, not with the next feed
+                _x, _y = self.insert_log(True)
                 return False, err
         else:
             raise XIDBException(constants.ERR_NO_DB)
@@ -561,15 +721,39 @@ class XbrlIndexDB:
             count if not is_successful else 0
         )
         if isinstance(note, str):
-            existing_error: str = (
-                str(self.current_task_tracker.task_notes) + "|"
-                if isinstance(self.current_task_tracker.task_notes, str)
-                else ""
-            )
-            self.current_task_tracker.task_notes = (
-                f"{existing_error}{truncate_string(note)}"
-            )
-        self.tracker_session.commit()  # type: ignore[union-attr]
+            # notes are kept in a bounded buffer and written on close
+            self._tracker_notes.append(truncate_string(note))
+        # commit every few advances or secs, pending counts are committed
+        # when the tracker is closed
+        self._tracker_pending_advances += 1
+        now = time.monotonic()
+        if (
+            self._tracker_pending_advances >= constants.TRACKER_COMMIT_EVERY
+            or now - self._tracker_last_commit
+            >= constants.TRACKER_COMMIT_INTERVAL
+        ):
+            self.tracker_session.commit()  # type: ignore[union-attr]
+            self._tracker_pending_advances = 0
+            self._tracker_last_commit = now
+
+    def _print_progress(self, template: str, **kwargs: Any) -> None:
+        """Print current task progress on the same line, at most once per
+        `PROGRESS_PRINT_INTERVAL`, `template` is formatted with tracker's
+        completed, failed and total items and `kwargs` only when printed"""
+        now = time.monotonic()
+        if now - self._last_progress_print < constants.PROGRESS_PRINT_INTERVAL:
+            return
+        self._last_progress_print = now
+        assert isinstance(self.current_task_tracker, BASE_M.TaskTracker)
+        print(
+            template.format(
+                completed=self.current_task_tracker.completed_items,
+                failed=self.current_task_tracker.failed_items,
+                total=self.current_task_tracker.total_items,
+                **kwargs,
+            ),
+            end="\r",
+        )
 
     def _close_tracker(
         self,
@@ -593,14 +777,17 @@ class XbrlIndexDB:
         self.current_task_tracker.is_interrupted = is_interrupted
         self.current_task_tracker.is_completed = is_completed
         if isinstance(note, str):
+            self._tracker_notes.append(truncate_string(note))
+        if self._tracker_notes:
             existing_error = (
                 str(self.current_task_tracker.task_notes) + "|"
                 if self.current_task_tracker.task_notes
                 else ""
             )
-            self.current_task_tracker.task_notes = (
-                f"{existing_error}{truncate_string(note)}"
+            self.current_task_tracker.task_notes = existing_error + "|".join(
+                self._tracker_notes
             )
+            self._tracker_notes.clear()
         # if self.current_task_tracker.task_notes == "|":
         #     self.current_task_tracker.task_notes = None
         last_updated = BASE_M.LastUpdate(
@@ -613,6 +800,7 @@ class XbrlIndexDB:
         self.tracker_session.close()
         self.current_task_tracker = None
         self.tracker_session = None
+        self._tracker_pending_advances = 0
 
     def update_feeds(
         self,
@@ -621,9 +809,11 @@ class XbrlIndexDB:
         include_latest: bool = True,
         reload_cache: bool = True,
         loc: str | None = None,
+        use_feed_cache: bool = True,
     ) -> None:
         """wrapper around all tasks to update SEC feeds load,
-        filter, extract and insert"""
+        filter, extract and insert, `use_feed_cache=False` extracts new
+        monthly feeds again instead of using feeds cache"""
         ok_to_continue = self.make_tracker(
             constants.DB_UPDATE_FEEDS,
             from_date=from_date,
@@ -652,9 +842,35 @@ class XbrlIndexDB:
 
             # process each feed
             start_time = time.perf_counter()
-
+            # download feeds concurrently, then load and insert them one
+            # at a time from the web cache (arelle model manager and db
+            # writes are not shared across threads), new feeds in feeds
+            # cache are not downloaded
+            prefetched = set(
+                prefetch_rss_feeds(
+                    self.cntlr,
+                    [
+                        x
+                        for x in new_and_modified_feeds
+                        if not (
+                            use_feed_cache
+                            and x["new_or_modified"] == "new"
+                            and is_feed_cached(
+                                self.cntlr, x["link"], x["last_modified_date"]
+                            )
+                        )
+                    ],
+                    reload_cache,
+                )
+            )
             for feed_data_dict in new_and_modified_feeds:
-                stats = self.insert_feed_data(feed_data_dict, reload_cache)
+                is_prefetched = feed_data_dict["link"] in prefetched
+                feed_data_dict["is_prefetched"] = is_prefetched
+                stats = self.insert_feed_data(
+                    feed_data_dict,
+                    reload_cache and not is_prefetched,
+                    use_feed_cache,
+                )
                 self._advance_tracker_counts(
                     1,
                     bool(stats[0]),
@@ -730,80 +946,73 @@ class XbrlIndexDB:
 
     def get_changed_and_new_ciks(self) -> tuple[set[Any], set[Any]]:
         """Checks for new and modified filers information"""
-        new_ciks = changed_ciks = set()
+        new_ciks: set[Any] = set()
+        changed_ciks: set[Any] = set()
         with Session(self.engine) as session:
-            cte_x = (
-                session.query(
-                    SEC.SecFiling.cik_number,
-                    func.max(SEC.SecFiling.filing_id).label("filing_id"),
-                )
-                .group_by(SEC.SecFiling.cik_number)
-                .cte(name="x")
-            )
-            cte_d = (
+            # latest filing of each cik
+            ranked_filings = session.query(
+                SEC.SecFiling.cik_number,
+                SEC.SecFiling.company_name,
+                SEC.SecFiling.pub_date,
+                func.row_number()
+                .over(
+                    partition_by=SEC.SecFiling.cik_number,
+                    order_by=SEC.SecFiling.filing_id.desc(),
+                )
+                .label("rn"),
+            ).subquery(name="y")
+            last_name_change = (
                 session.query(
+                    SEC.SecFormerNames.cik_number,
                     func.max(SEC.SecFormerNames.date_changed).label(
                         "date_changed"
                     ),
-                    SEC.SecFormerNames.cik_number,
-                )
-                .join(
-                    cte_x,
-                    cte_x.c.cik_number == SEC.SecFormerNames.cik_number,
-                    isouter=True,
                 )
                 .group_by(SEC.SecFormerNames.cik_number)
-                .cte(name="d")
-            )
-            cte_y = (
-                session.query(
-                    SEC.SecFiling.cik_number,
-                    SEC.SecFiling.company_name,
-                    SEC.SecFiling.filing_id,
-                    SEC.SecFiling.pub_date,
-                )
-                .join(cte_x, cte_x.c.filing_id == SEC.SecFiling.filing_id)
-                .cte(name="y")
+                .subquery(name="d")
             )
-            cte_n = (
+            ciks_changed_names_qry = (
                 session.query(
-                    cte_y.c.cik_number,
-                    cte_y.c.company_name,
-                    cte_y.c.filing_id,
-                    SEC.SecFiler.conformed_name,
-                    label(
-                        "test",
-                        and_(
-                            func.lower(SEC.SecFiler.conformed_name)
-                            != func.lower(cte_y.c.company_name),
-                            cast(cte_y.c.pub_date, Date())
-                            > cte_d.c.date_changed,
-                        ),
-                    ),
+                    ranked_filings.c.cik_number, literal("C").label("kind")
                 )
-                .select_from(cte_y)
                 .join(
                     SEC.SecFiler,
-                    SEC.SecFiler.cik_number == cte_y.c.cik_number,
+                    SEC.SecFiler.cik_number == ranked_filings.c.cik_number,
+                )
+                .join(
+                    last_name_change,
+                    last_name_change.c.cik_number
+                    == ranked_filings.c.cik_number,
+                )
+                .filter(
+                    ranked_filings.c.rn == 1,
+                    func.lower(SEC.SecFiler.conformed_name)
+                    != func.lower(ranked_filings.c.company_name),
+                    cast(ranked_filings.c.pub_date, Date())
+                    > last_name_change.c.date_changed,
                 )
-                .join(cte_d, cte_y.c.cik_number == cte_d.c.cik_number)
-                .cte(name="n")
-            )
-            ciks_changed_names_qry = (
-                session.query(cte_n)
-                .filter(operators.is_(cte_n.c.test, True))
-                .order_by(cte_n.c.cik_number)
             )
-            changed_ciks = {x[0] for x in ciks_changed_names_qry}
-
-            ciks_new_qry = session.query(
-                SEC.SecFiling.cik_number.distinct()
-            ).filter(
-                ~exists().where(
-                    SEC.SecFiler.cik_number == SEC.SecFiling.cik_number
+            # anti-join instead of correlated not exists
+            distinct_ciks = session.query(
+                SEC.SecFiling.cik_number.distinct().label("cik_number")
+            ).subquery()
+            ciks_new_qry = (
+                session.query(
+                    distinct_ciks.c.cik_number, literal("N").label("kind")
+                )
+                .outerjoin(
+                    SEC.SecFiler,
+                    SEC.SecFiler.cik_number == distinct_ciks.c.cik_number,
                 )
+                .filter(SEC.SecFiler.cik_number.is_(None))
             )
-            new_ciks = {x[0] for x in ciks_new_qry}
+            for cik_number, kind in ciks_changed_names_qry.union_all(
+                ciks_new_qry
+            ):
+                if kind == "N":
+                    new_ciks.add(cik_number)
+                else:
+                    changed_ciks.add(cik_number)
         return new_ciks, changed_ciks
 
     def _filer_action_loop(
@@ -831,18 +1040,34 @@ class XbrlIndexDB:
         )
         start_time = time.perf_counter()
         print(constants.MSG_WHILE_SAVED, end="\n")
-        for cik in ciks:
-            time.sleep(0.2)  # SEC 10 requests per second limit
-            url: str | None = None
+
+        # fetch filers information concurrently, requests are rate limited
+        # to respect SEC requests per second limit, db writes stay in this
+        # thread
+        def fetch_filer_information(cik: str) -> dict[str, Any]:
             if self.is_test:
                 assert isinstance(self._db_mock_test_data_dir, pathlib.Path)
                 url = self._db_mock_test_data_dir.joinpath(
                     "sec", "ciks", cik
                 ).as_uri()
-            stats = update_filer_information(
-                self.engine, self.cntlr, cik, is_existing, url
-            )
-            if not stats[0]:
+                return get_filer_information(self.cntlr, cik, 5, url)
+            # back off and retry when SEC throttles requests
+            for attempt in range(2):
+                self._sec_limiter.acquire()
+                try:
+                    return get_filer_information(self.cntlr, cik, 5)
+                except HTTPError as err:
+                    if err.code not in (429, 503):
+                        raise
+                    time.sleep(2**attempt)
+            self._sec_limiter.acquire()
+            return get_filer_information(self.cntlr, cik, 5)
+
+        def record_filer_stats(
+            cik: str, stats: tuple[bool, Any], retry: bool = True
+        ) -> None:
+            assert isinstance(self.current_task_tracker, BASE_M.TaskTracker)
+            if not stats[0] and retry:
                 failed_ciks.add(cik)
             self._advance_tracker_counts(
                 1,
@@ -851,15 +1076,71 @@ class XbrlIndexDB:
                 if not stats[0]
                 else None,
             )
-            print(
-                f'{action}{"" if is_existing else " new"} cik:',
-                self.current_task_tracker.completed_items,
-                "/",
-                self.current_task_tracker.total_items,
-                "->",
-                cik,
-                end="\r",
+            self._print_progress(
+                f'{action}{"" if is_existing else " new"} cik: '
+                "{completed} / {total} -> {cik}",
+                cik=cik,
             )
+
+        def save_batch(batch: list[dict[str, Any]]) -> None:
+            try:
+                save_filers_information(self.engine, is_existing, batch)
+            except Exception:
+                # save one by one to isolate failing filers
+                for filer_info in batch:
+                    record_filer_stats(
+                        filer_info["cik"],
+                        save_filer_information(
+                            self.engine,
+                            filer_info["cik"],
+                            is_existing,
+                            filer_info,
+                        ),
+                    )
+            else:
+                for filer_info in batch:
+                    record_filer_stats(filer_info["cik"], (True, None))
+
+        batch: list[dict[str, Any]] = []
+        with ThreadPoolExecutor(
+            max_workers=constants.SEC_MAX_REQUESTS_PER_SECOND
+        ) as executor:
+            # keep a bounded number of fetches in flight, fetched results
+            # wait in memory only while this thread is saving
+            ciks_iter = iter(ciks)
+            pending: dict[Future[dict[str, Any]], str] = {}
+
+            def submit_fetches(count: int) -> None:
+                for cik in islice(ciks_iter, count):
+                    future = executor.submit(fetch_filer_information, cik)
+                    pending[future] = cik
+
+            submit_fetches(constants.FILERS_FETCH_QUEUE_SIZE)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cik = pending.pop(future)
+                    try:
+                        batch.append(future.result())
+                    except Exception as err:
+                        # retrying won't help ciks that SEC doesn't know
+                        record_filer_stats(
+                            cik,
+                            filer_information_failed(
+                                self.engine, self.cntlr, cik, err
+                            ),
+                            not (
+                                isinstance(err, HTTPError)
+                                and err.code
+                                in constants.HTTP_PERMANENT_ERROR_CODES
+                            ),
+                        )
+                    if len(batch) >= constants.FILERS_SAVE_BATCH_SIZE:
+                        save_batch(batch)
+                        batch = []
+                submit_fetches(len(done))
+        if batch:
+            save_batch(batch)
         time_taken = get_time_elapsed(start_time)
 
         successful = self.current_task_tracker.successful_items
@@ -892,10 +1173,10 @@ class XbrlIndexDB:
         # for testing
         if isinstance(_n, int):
             if len(new_ciks_to_insert) > _n:
-                new_ciks_to_insert = set(list(new_ciks_to_insert)[:_n])
+                new_ciks_to_insert = set(islice(new_ciks_to_insert, _n))
             if len(existing_ciks_to_update) > _n:
                 existing_ciks_to_update = set(
-                    list(existing_ciks_to_update)[:_n]
+                    islice(existing_ciks_to_update, _n)
                 )
         if new_ciks_to_insert:
             ok_to_continue = self.make_tracker(constants.DB_INSERT_NEW_FILERS)
@@ -950,9 +1231,13 @@ class XbrlIndexDB:
                     **log_template("info", self.database),
                 )
                 start_time = time.perf_counter()
-                cache_file_filer = pickle_table_data(self.engine, SEC.SecFiler)
-                cache_file_names = pickle_table_data(
-                    self.engine, SEC.SecFormerNames
+                # only refresh cached rows of inserted/updated ciks
+                changed_ciks = new_ciks_to_insert | existing_ciks_to_update
+                cache_file_filer = update_pickle_table_data(
+                    self.engine, SEC.SecFiler, "cik_number", changed_ciks
+                )
+                cache_file_names = update_pickle_table_data(
+                    self.engine, SEC.SecFormerNames, "cik_number", changed_ciks
                 )
                 time_taken = get_time_elapsed(start_time)
                 self.cntlr.addToLog(
@@ -987,17 +1272,18 @@ class XbrlIndexDB:
     ) -> None:
         """Updates filers created in this db before the specified date"""
         try:
-            parser.parse(before_date)
+            before_datetime = parser.parse(before_date)
         except Exception as err:
             raise XIDBException(constants.ERR_BAD_DATE) from err
 
-        ciks_to_process = []
-        with Session(self.engine) as session:
-            ciks_qry = session.query(SEC.SecFiler.cik_number).filter(
-                parser.parse(before_date)
-                > cast(SEC.SecFiler.created_updated_at, Date())
+        ciks_qry = select(SEC.SecFiler.cik_number).where(
+            bindparam("before_date", type_=DateTime)
+            > cast(SEC.SecFiler.created_updated_at, Date())
+        )
+        with self.engine.connect() as conn:
+            ciks_to_process = list(
+                conn.scalars(ciks_qry, {"before_date": before_datetime})
             )
-            ciks_to_process = [x[0] for x in ciks_qry]
 
         if len(ciks_to_process) > 0:
             try:
@@ -1023,14 +1309,21 @@ class XbrlIndexDB:
         a list of ciks ['0000000001', '0000000002', ...]"""
 
         if len(ciks_to_process) > 0:
-            existing_ciks = set()
-            new_ciks = set()
-            with Session(self.engine) as session:
-                existing = session.query(SEC.SecFiler.cik_number).filter(
-                    SEC.SecFiler.cik_number.in_(ciks_to_process)
-                )
-                existing_ciks = {x[0] for x in existing}
-                new_ciks = set(ciks_to_process) - existing_ciks
+            existing_ciks: set[str] = set()
+            unique_ciks = list(set(ciks_to_process))
+            # one statement reused for chunks of ciks, keeps parameters
+            # count under backends limits
+            existing_qry = select(SEC.SecFiler.cik_number).where(
+                SEC.SecFiler.cik_number.in_(bindparam("ciks", expanding=True))
+            )
+            with self.engine.connect() as conn:
+                for ciks_chunk in chunks(
+                    unique_ciks, constants.QUERY_IN_CHUNK_SIZE
+                ):
+                    existing_ciks.update(
+                        conn.scalars(existing_qry, {"ciks": ciks_chunk})
+                    )
+            new_ciks = set(unique_ciks) - existing_ciks
             try:
                 self._filers_insert_update(
                     new_ciks, existing_ciks, retries, _n
@@ -1068,9 +1361,9 @@ class XbrlIndexDB:
         start_time = time.perf_counter()
         existing_dups = 0
         with Session(self.engine) as session1:
-            dups_check = session1.query(SEC.ViewDuplicateFiling).all()
-            existing_dups = len(dups_check)
-        # return
+            existing_dups = session1.scalar(
+                select(func.count()).select_from(SEC.ViewDuplicateFiling)
+            )
         if existing_dups > 0:
             self.cntlr.addToLog(
                 f"Tagging {existing_dups:,} duplicates found.",
@@ -1078,39 +1371,43 @@ class XbrlIndexDB:
             )
             self.current_task_tracker.total_items = existing_dups
             self.tracker_session.commit()
-            duplicates: Any = []
-            with Session(self.engine) as session2:
-                duplicates = session2.query(SEC.SecFiling).join(
-                    SEC.ViewDuplicateFiling,
-                    SEC.SecFiling.filing_id
-                    == (
-                        SEC.ViewDuplicateFiling.filing_id  # type: ignore[attr-defined]
-                    ),
+            # distinct forces the view to be materialized, mysql refuses
+            # to update a table that is selected from in the subquery
+            duplicate_ids = (
+                select(
+                    SEC.ViewDuplicateFiling.filing_id  # type: ignore[attr-defined]
                 )
+                .distinct()
+                .subquery()
+            )
+            with Session(self.engine) as session2:
                 try:
-                    update_filings_stmt = (
-                        update(SEC.SecFiling)
+                    update_files_stmt = (
+                        update(SEC.SecFile)
                         .where(
-                            SEC.SecFiling.filing_id.in_(
-                                [x.filing_id for x in duplicates]
+                            SEC.SecFile.filing_id.in_(
+                                select(duplicate_ids.c.filing_id)
                             )
                         )
                         .values(duplicate=1)
+                        .execution_options(synchronize_session=False)
                     )
-                    update_files_stmt = (
-                        update(SEC.SecFile)
+                    update_filings_stmt = (
+                        update(SEC.SecFiling)
                         .where(
-                            SEC.SecFile.filing_id.in_(
-                                [x.filing_id for x in duplicates]
+                            SEC.SecFiling.filing_id.in_(
+                                select(duplicate_ids.c.filing_id)
                             )
                         )
                         .values(duplicate=1)
+                        .execution_options(synchronize_session=False)
                     )
+                    # files first, the view only lists untagged filings
+                    session2.execute(update_files_stmt)
                     filings_cur = session2.execute(update_filings_stmt)
                     filings_rows = (
                         filings_cur.rowcount  # type: ignore[attr-defined]
                     )
-                    session2.execute(update_files_stmt)
                     session2.commit()
                     self._advance_tracker_counts(filings_rows, True)
                 except Exception as err:
@@ -1151,15 +1448,16 @@ class XbrlIndexDB:
     def get_esef_existing_filings_entities(self) -> tuple[set[Any], set[Any]]:
         """Get existing ESEF entities (LEI)"""
         start_time = time.perf_counter()
-        with Session(self.engine) as session:
-            existing_esef_filings = {
-                x[0]
-                for x in session.query(ESEF.EsefFiling.filing_key.distinct())
-            }
-            existing_esef_entities = {
-                x[0]
-                for x in session.query(ESEF.EsefEntity.entity_lei.distinct())
-            }
+        # stream keys into the sets (server side cursor where supported)
+        with self.engine.connect().execution_options(
+            stream_results=True, max_row_buffer=10000
+        ) as conn:
+            existing_esef_filings = set(
+                conn.scalars(select(ESEF.EsefFiling.filing_key).distinct())
+            )
+            existing_esef_entities = set(
+                conn.scalars(select(ESEF.EsefEntity.entity_lei).distinct())
+            )
         time_taken = get_time_elapsed(start_time)
         self.cntlr.addToLog(
             f"Retrieved existing ESEF filings and "
@@ -1189,55 +1487,83 @@ class XbrlIndexDB:
         new_esef_entities = index_entities - existing_esef_entities
         return new_esef_entities, new_esef_filings
 
-    def _insert_esef_filing(
+    def _prepare_esef_filing(
         self, filing_addr: str, filing: dict[str, Any]
-    ) -> None:
-        """Helper to insert esef filing data"""
-        assert isinstance(self.current_task_tracker, BASE_M.TaskTracker)
+    ) -> tuple[dict[str, Any], list[Any], list[Any], list[Any]] | None:
+        """Helper to get esef filing data, errors, languages and inferred
+        languages, None if there is no filing data"""
         esef_filing, esef_error, esef_filing_langs = get_esef_all_filing_info(
             filing_addr=filing_addr, filing_dict=filing
         )
-        errors = (
-            [ESEF.EsefFilingError(**x) for x in esef_error]
-            if esef_error
-            else []
-        )
-        langs = (
-            [ESEF.EsefFilingLang(**x) for x in esef_filing_langs]
-            if esef_filing_langs
-            else []
-        )
-        filing_inst = ESEF.EsefFiling(
-            **esef_filing, errors=errors, langs=langs
-        )
+        if not esef_filing:
+            return None
+        inferred_langs: list[Any] = []
         # try to detect language from json instance
-        if filing_inst.xbrl_json_instance_link is not None:
-            json_xbrl_uri = filing_inst.xbrl_json_instance_link
+        json_xbrl_uri = ESEF.EsefFiling(**esef_filing).xbrl_json_instance_link
+        if json_xbrl_uri is not None:
             if self.is_test:
                 assert isinstance(self._db_mock_test_data_dir, pathlib.Path)
                 json_xbrl_uri = self._db_mock_test_data_dir.joinpath(
-                    "esef", "json_xbrl", filing_inst.xbrl_json_instance
+                    "esef", "json_xbrl", esef_filing["xbrl_json_instance"]
                 ).as_uri()
             inferred_langs = infer_esef_filing_language(
-                self.cntlr, json_xbrl_uri
+                self.cntlr,
+                json_xbrl_uri,
+                None if self.is_test else self._esef_limiter,
             )
-            if len(inferred_langs) > 0:
-                inferred_langs_instances = [
+        return (
+            esef_filing,
+            esef_error or [],
+            esef_filing_langs or [],
+            inferred_langs,
+        )
+
+    def _save_esef_filings(
+        self,
+        prepared_filings: list[
+            tuple[dict[str, Any], list[Any], list[Any], list[Any]]
+        ],
+    ) -> None:
+        """Helper to insert a batch of prepared esef filings in one
+        transaction, filings are inserted one by one if the batch fails"""
+        assert isinstance(self.current_task_tracker, BASE_M.TaskTracker)
+
+        def make_filing(
+            esef_filing: dict[str, Any],
+            errors: list[Any],
+            langs: list[Any],
+            inferred_langs: list[Any],
+        ) -> ESEF.EsefFiling:
+            filing_inst = ESEF.EsefFiling(
+                **esef_filing,
+                errors=[ESEF.EsefFilingError(**x) for x in errors],
+                langs=[ESEF.EsefFilingLang(**x) for x in langs],
+            )
+            if inferred_langs:
+                filing_inst.inferred_langs = [
                     ESEF.EsefInferredFilingLanguage(**x)
                     for x in inferred_langs
                 ]
-                filing_inst.inferred_langs = inferred_langs_instances
-                time.sleep(0.2)  # give the api a break
-        with Session(self.engine) as session:
-            if esef_filing:
-                session.add(filing_inst)
-            session.commit()
-        self._advance_tracker_counts(1, True)
-        print(
-            f"Inserted {self.current_task_tracker.completed_items} / "
-            f"{self.current_task_tracker.total_items}",
-            end="\r",
-        )
+            return filing_inst
+
+        try:
+            with Session(self.engine) as session:
+                session.add_all([make_filing(*x) for x in prepared_filings])
+                session.commit()
+            results: list[str | None] = [None] * len(prepared_filings)
+        except Exception:
+            results = []
+            for prepared_filing in prepared_filings:
+                try:
+                    with Session(self.engine) as session:
+                        session.add(make_filing(*prepared_filing))
+                        session.commit()
+                    results.append(None)
+                except Exception as err:
+                    results.append(truncate_string(str(err)))
+        for note in results:
+            self._advance_tracker_counts(1, note is None, note)
+            self._print_progress("Inserted {completed} / {total}")
 
     def insert_esef_new_filings(
         self, esef_index: dict[str, Any], new_esef_filings: set[str]
@@ -1254,20 +1580,37 @@ class XbrlIndexDB:
         self.current_task_tracker.total_items = len(new_esef_filings)
         self.tracker_session.commit()
         started_time = time.perf_counter()
-        for _entity, entity_filings in esef_index.items():
+        prepared_filings: list[
+            tuple[dict[str, Any], list[Any], list[Any], list[Any]]
+        ] = []
+        # pick new filings from the index in one pass
+        new_filings = {
+            filing_addr: filing
+            for entity_filings in esef_index.values()
+            for filing_addr, filing in entity_filings["filings"].items()
+            if filing_addr in new_esef_filings
+        }
+        for filing_addr, filing in new_filings.items():
             try:
-                for filing_addr, filing in entity_filings["filings"].items():
-                    if filing_addr in new_esef_filings:
-                        self._insert_esef_filing(filing_addr, filing)
+                prepared_filing = self._prepare_esef_filing(
+                    filing_addr, filing
+                )
+                if prepared_filing is None:
+                    self._advance_tracker_counts(1, True)
+                    continue
+                prepared_filings.append(prepared_filing)
+                if (
+                    len(prepared_filings)
+                    >= constants.ESEF_FILINGS_SAVE_BATCH_SIZE
+                ):
+                    self._save_esef_filings(prepared_filings)
+                    prepared_filings = []
             except Exception as err:
                 note = truncate_string(str(err))
                 self._advance_tracker_counts(1, False, note)
-                print(
-                    f"Failed to insert "
-                    f"{self.current_task_tracker.failed_items} / "
-                    f"{self.current_task_tracker.total_items}",
-                    end="\r",
-                )
+                self._print_progress("Failed to insert {failed} / {total}")
+        if prepared_filings:
+            self._save_esef_filings(prepared_filings)
         time_taken = get_time_elapsed(started_time)
         total = self.current_task_tracker.total_items
         completed = self.current_task_tracker.completed_items
@@ -1281,6 +1624,68 @@ class XbrlIndexDB:
         self.insert_log()
         return failed
 
+    def _insert_esef_entities(self, lei_data: list[dict[str, Any]]) -> None:
+        """Helper to insert esef entities of a chunk of lei records in one
+        transaction, entities are inserted one by one if the chunk fails"""
+        assert isinstance(self.current_task_tracker, BASE_M.TaskTracker)
+        # get the chunk's isins concurrently rather than one by one
+        prefetched_isins = prefetch_esef_entities_isins(
+            self.cntlr,
+            [
+                x["attributes"]["lei"]
+                for x in lei_data
+                if "lei" in x.get("attributes", {})
+            ],
+            self.is_test,
+            self._db_mock_test_data_dir,
+            limiter=self._gleif_limiter,
+        )
+
+        def make_entity(
+            esef_entity: dict[str, Any], esef_other_names: list[Any]
+        ) -> ESEF.EsefEntity:
+            other_names = [
+                ESEF.EsefEntityOtherName(**other_name)
+                for other_name in esef_other_names
+            ]
+            return ESEF.EsefEntity(**esef_entity, other_names=other_names)
+
+        entities: list[tuple[dict[str, Any], list[Any]]] = []
+        for entity_lei_data in lei_data:
+            try:
+                entities.append(
+                    extract_esef_entity_lei_info(
+                        self.cntlr,
+                        entity_lei_data,
+                        self.is_test,
+                        self._db_mock_test_data_dir,
+                        prefetched_isins,
+                        self._gleif_limiter,
+                    )
+                )
+            except Exception as err:
+                note = truncate_string(str(err))
+                self._advance_tracker_counts(1, False, note)
+        if not entities:
+            return
+        try:
+            with Session(self.engine) as session:
+                session.add_all([make_entity(*x) for x in entities])
+                session.commit()
+            self._advance_tracker_counts(len(entities), True)
+        except Exception:
+            # isolate the failing entities
+            for entity in entities:
+                try:
+                    with Session(self.engine) as session:
+                        session.add(make_entity(*entity))
+                        session.commit()
+                    self._advance_tracker_counts(1, True)
+                except Exception as err:
+                    note = truncate_string(str(err))
+                    self._advance_tracker_counts(1, False, note)
+        self._print_progress("inserted {completed} / {total}")
+
     def insert_esef_new_entities(self, new_esef_entities: set[str]) -> int:
         """Insert new ESEF entities discovered."""
         failed = 0
@@ -1302,51 +1707,38 @@ class XbrlIndexDB:
             "page[size]=100&filter[lei]="
         )
 
-        for chunk in chunked:
-            url: str = lei_url + ",".join(chunk)
-            if self.is_test:
-                assert isinstance(self._db_mock_test_data_dir, pathlib.Path)
-                url = self._db_mock_test_data_dir.joinpath(
-                    "esef", "lei"
-                ).as_uri()
+        def get_lei_data(url: str) -> list[dict[str, Any]]:
             lei_data_resp = self.cntlr.webCache.opener.open(url, timeout=5)
-            lei_data = json.loads(lei_data_resp.read().decode())
-            lei_data = lei_data["data"]
-            if self.is_test:
-                lei_data = [x for x in lei_data if x["id"] in chunk]
-            for entity_lei_data in lei_data:
-                try:
-                    (
-                        esef_entity,
-                        esef_other_names,
-                    ) = extract_esef_entity_lei_info(
-                        self.cntlr,
-                        entity_lei_data,
-                        self.is_test,
-                        self._db_mock_test_data_dir,
-                    )
-                    other_names = [
-                        ESEF.EsefEntityOtherName(**other_name)
-                        for other_name in esef_other_names
-                    ]
-                    entity = ESEF.EsefEntity(
-                        **esef_entity, other_names=other_names
-                    )
-                    with Session(self.engine) as session:
-                        session.add(entity)
-                        # session.bulk_save_objects(other_names)
-                        session.commit()
-                    self._advance_tracker_counts(1, True)
-                    print(
-                        f"inserted "
-                        f"{self.current_task_tracker.completed_items} / "
-                        f"{self.current_task_tracker.total_items}",
-                        end="\r",
-                    )
-                    time.sleep(0.2)
-                except Exception as err:
-                    note = truncate_string(str(err))
-                    self._advance_tracker_counts(1, False, note)
+            lei_data: list[dict[str, Any]] = json.loads(
+                lei_data_resp.read().decode()
+            )["data"]
+            return lei_data
+
+        if self.is_test:
+            # mock data holds all test records, load it once and pick
+            # each chunk's records
+            assert isinstance(self._db_mock_test_data_dir, pathlib.Path)
+            mock_lei_data = get_lei_data(
+                self._db_mock_test_data_dir.joinpath("esef", "lei").as_uri()
+            )
+
+            def fetch_lei_data(chunk: list[str]) -> list[dict[str, Any]]:
+                chunk_set = set(chunk)
+                return [x for x in mock_lei_data if x["id"] in chunk_set]
+
+        else:
+
+            def fetch_lei_data(chunk: list[str]) -> list[dict[str, Any]]:
+                self._gleif_limiter.acquire()
+                return get_lei_data(lei_url + ",".join(chunk))
+
+        # download chunks concurrently, entities are inserted from this
+        # thread in chunks order
+        with ThreadPoolExecutor(
+            max_workers=constants.LEI_FETCH_MAX_WORKERS
+        ) as executor:
+            for lei_data in executor.map(fetch_lei_data, chunked):
+                self._insert_esef_entities(lei_data)
 
         time_taken = get_time_elapsed(started_time)
         total = self.current_task_tracker.total_items
@@ -1419,27 +1811,26 @@ class XbrlIndexDB:
                     filings.c.filing_root,
                     filings.c.report_package,
                     filings.c.lang,
-                    func.count().label("xcount"),
-                ).group_by(
+                )
+                .group_by(
                     filings.c.filing_root,
                     filings.c.report_package,
                     filings.c.lang,
                 )
-            ).cte(name="grouped")
+                .having(func.count() > 1)
+            ).subquery(name="grouped")
 
+            # rank (not row_number) so that filings sharing the latest
+            # filing number are all kept
             detect_last = (
                 session.query(
-                    grouped,
-                    filings,
-                    not_(
-                        func.max(filings.c.filing_number).over(
-                            partition_by=[
-                                filings.c.filing_root,
-                                filings.c.lang,
-                            ]
-                        )
-                        == filings.c.filing_number
-                    ).label("is_not_max"),
+                    filings.c.filing_id,
+                    func.rank()
+                    .over(
+                        partition_by=[filings.c.filing_root, filings.c.lang],
+                        order_by=filings.c.filing_number.desc(),
+                    )
+                    .label("rn"),
                 )
                 .select_from(grouped)
                 .join(
@@ -1448,11 +1839,10 @@ class XbrlIndexDB:
                     & (grouped.c.report_package == filings.c.report_package)
                     & (grouped.c.lang == filings.c.lang),
                 )
-                .where(grouped.c.xcount > 1)
-            ).cte(name="detect_last")
+            ).subquery(name="detect_last")
 
             amended_filings_qry = session.query(detect_last.c.filing_id).where(
-                detect_last.c.is_not_max
+                detect_last.c.rn > 1
             )
             amended_filings = [x[0] for x in amended_filings_qry]
             # detect filings with multiple langs
@@ -1481,21 +1871,26 @@ class XbrlIndexDB:
         """Tags amended and filings issued in multiple languages"""
         start_time = time.perf_counter()
         amended, multi_lang = self.esef_detect_amended_and_multi_langs()
+        # one update statement executed for many ids, instead of loading
+        # each filing, no IN list so no parameter count limit
+        filing_id_param = ESEF.EsefFiling.filing_id == bindparam("b_id")
         with Session(self.engine) as session:
             if len(amended) > 0:
-                amended_qry = session.query(ESEF.EsefFiling).filter(
-                    ESEF.EsefFiling.filing_id.in_(amended)
+                session.execute(
+                    update(ESEF.EsefFiling.__table__)
+                    .where(filing_id_param)
+                    .values(is_amended_hint=True),
+                    [{"b_id": x} for x in set(amended)],
                 )
-                for filing in amended_qry:
-                    filing.is_amended_hint = True
-                session.commit()
             if len(multi_lang) > 0:
-                multi_lang_qry = session.query(ESEF.EsefFiling).filter(
-                    ESEF.EsefFiling.filing_id.in_(multi_lang)
+                session.execute(
+                    update(ESEF.EsefFiling.__table__)
+                    .where(filing_id_param)
+                    .values(other_langs_hint=True),
+                    [{"b_id": x} for x in set(multi_lang)],
                 )
-                for filing_ in multi_lang_qry:
-                    filing_.other_langs_hint = True
-                session.commit()
+            # both updates in one transaction
+            session.commit()
         time_taken = get_time_elapsed(start_time)
         self.cntlr.addToLog(
             f"Detected {len(amended):,} amended filings and "
@@ -1560,20 +1955,22 @@ class XbrlIndexDB:
 
         if not self.is_test:
             start_time = time.perf_counter()
-            for table_ in [
-                ESEF.EsefEntity,
-                ESEF.EsefEntityOtherName,
-                ESEF.EsefFiling,
-                ESEF.EsefFilingError,
-                ESEF.EsefFilingLang,
-                ESEF.EsefInferredFilingLanguage,
-            ]:
-                cache_file_name = pickle_table_data(self.engine, table_)
+            cache_file_names = pickle_tables_data(
+                self.engine,
+                [
+                    ESEF.EsefEntity,
+                    ESEF.EsefEntityOtherName,
+                    ESEF.EsefFiling,
+                    ESEF.EsefFilingError,
+                    ESEF.EsefFilingLang,
+                    ESEF.EsefInferredFilingLanguage,
+                ],
+            )
 
             time_taken = get_time_elapsed(start_time)
             self.cntlr.addToLog(
-                f"Finished refreshing ESEF cached data ({cache_file_name})"
-                f" in {time_taken} sec(s).",
+                f"Finished refreshing ESEF cached data "
+                f"({', '.join(cache_file_names)}) in {time_taken} sec(s).",
                 **log_template("info", self.database),
             )
             self.insert_log()
@@ -1588,26 +1985,31 @@ class XbrlIndexDB:
         filename: str,
         title: str | None = None,
         description: str | None = None,
-    ) -> ModelXbrl:
+    ) -> tuple[ModelXbrl, int]:
         """Writes a list of filings as rss feed similar to SEC feeds that
-        can be loaded by arelle."""
+        can be loaded by arelle, returns the model and count of items."""
         time_format_tz = "%a, %d %b %Y %H:%M:%S %Z"
         link = filename
         date_time = datetime.datetime.now(tz=pytz.timezone("utc")).strftime(
             time_format_tz
         )
-        # document header elements
-        root = etree.Element("rss", version="2.0")
+        model_xbrl: ModelXbrl = create(self.cntlr.modelManager)
+        _parser, _parser_lookup_name, _parser_lookup_class = ObjFactory.parser(
+            model_xbrl, None
+        )
+        # build the document with arelle's parser so that it can be used
+        # as is, instead of serializing and parsing it again
+        root = _parser.makeelement("rss", version="2.0")
         channel = etree.SubElement(root, "channel")
-        title_elements = {
-            "title": title,
-            "link": link,
-            "description": description,
-            "language": "en-us",
-            "pubDate": date_time,
-            "lastBuildDate": date_time,
-        }
-        for tag, value in title_elements.items():
+        title_elements = (
+            ("title", title),
+            ("link", link),
+            ("description", description),
+            ("language", "en-us"),
+            ("pubDate", date_time),
+            ("lastBuildDate", date_time),
+        )
+        for tag, value in title_elements:
             etree.SubElement(channel, tag).text = value
         etree.SubElement(
             channel,
@@ -1617,16 +2019,16 @@ class XbrlIndexDB:
             rel="self",
             type="application/rss+xml",
         )
+        assert isinstance(self.database, str)
+        n_items = 0
         for filing_object in filings_list:
-            assert isinstance(self.database, str)
             filing_object.to_xml(channel, self.database)
+            n_items += 1
 
-        root_string = BytesIO(etree.tostring(root.getroottree()))
-        model_xbrl: ModelXbrl = create(self.cntlr.modelManager)
-        _parser, _parser_lookup_name, _parser_lookup_class = ObjFactory.parser(
-            model_xbrl, None
-        )
-        xmlDoc = etree.parse(root_string, parser=_parser)
+        xmlDoc = root.getroottree()
+        # drop proxies created while building, elements are looked up
+        # again as arelle's model objects
+        del root, channel
         modelDoc = ModelRssObject(
             model_xbrl, ModelDocument.Type.RSSFEED, xmlDocument=xmlDoc
         )
@@ -1636,7 +2038,7 @@ class XbrlIndexDB:
         for item in modelDoc.rssItems:
             item.init(modelDoc)
 
-        return model_xbrl
+        return model_xbrl, n_items
 
     def save_filings(
         self,
@@ -1646,38 +2048,68 @@ class XbrlIndexDB:
         title: str | None = None,
         description: str | None = None,
         return_object: bool = False,
+        pretty_print: bool = False,
     ) -> tuple[str, ModelDocument.ModelDocument | list[dict[str, Any]] | None]:
         """Saves a list of filings in the specified format in
         `type` "json" or "rss", saved to `filename`, if file name == 'memory'
-        file will not be saved"""
+        file will not be saved, `pretty_print` indents rss output"""
         result: ModelDocument.ModelDocument | list[
             dict[str, Any]
         ] | None = None
         result_len = 0
+        # load filings in batches with their files instead of one query
+        # per filing
+        entity = filings_list.column_descriptions[0]["entity"]
+        if entity is not None and "files" in inspect(entity).relationships:
+            filings_list = filings_list.options(selectinload(entity.files))
+        filings_list = filings_list.yield_per(constants.FILINGS_YIELD_PER)
         if type_ == "json":
-            result = []
-            for filing in filings_list:
-                filing_dict = filing.to_dict()
-                filing_dict["files"] = [x.to_dict() for x in filing.files]
-                result.append(filing_dict)
-            result_len = len(result)
-            if filename != "memory":
-                with open(filename, "w", encoding="utf-8") as _fh:
-                    json.dump(result, _fh, default=str)
+
+            def iter_filing_dicts() -> Iterator[dict[str, Any]]:
+                for filing in filings_list:
+                    filing_dict = filing.to_dict()
+                    filing_dict["files"] = [x.to_dict() for x in filing.files]
+                    yield filing_dict
+
+            if filename != "memory" and not return_object:
+                # stream filings to file without keeping them, output is
+                # the same as dumping the whole list
+                with open(
+                    filename, "w", encoding="utf-8", buffering=1 << 20
+                ) as _fh:
+                    _fh.write("[")
+                    for filing_dict in iter_filing_dicts():
+                        if result_len:
+                            _fh.write(", ")
+                        _fh.write(json.dumps(filing_dict, default=str))
+                        result_len += 1
+                    _fh.write("]")
+            else:
+                result = list(iter_filing_dicts())
+                result_len = len(result)
+                if filename != "memory":
+                    with open(filename, "w", encoding="utf-8") as _fh:
+                        json.dump(result, _fh, default=str)
         elif type_ == "rss":
-            model_xbrl = self._make_rss_feed(
+            model_xbrl, result_len = self._make_rss_feed(
                 filings_list, filename, title, description
             )
             assert isinstance(
                 model_xbrl.modelDocument, ModelDocument.ModelDocument
             )
-            result_len = len(getattr(model_xbrl.modelDocument, "rssItems", []))
             result = model_xbrl.modelDocument
             result.filepath = os.path.abspath(filename)
             xml_document = result.xmlDocument
-            if filename != "memory":
+            if filename != "memory" and pretty_print:
                 with open(filename, "w", encoding="utf-8") as _fh:
                     XmlUtil.writexml(_fh, xml_document, encoding="utf-8")
+            elif filename != "memory":
+                # lxml serializer, much faster than walking the tree in
+                # python as writexml does
+                with open(filename, "wb", buffering=1 << 20) as _bfh:
+                    xml_document.write(
+                        _bfh, encoding="utf-8", xml_declaration=True
+                    )
         else:
             raise XIDBException(
                 constants.ERR_BAD_TYPE,
@@ -1689,6 +2121,19 @@ class XbrlIndexDB:
         )
         return (filename, result if return_object else None)
 
+    def _get_industries_children(
+        self,
+    ) -> tuple[list[Any], dict[int, list[Any]]]:
+        """Helper to load industries in one query, returns industries rows
+        and rows of children industries by parent industry id"""
+        with self.engine.connect() as conn:
+            industries = list(conn.execute(select(SEC.SecIndustry.__table__)))
+        children: dict[int, list[Any]] = {}
+        for industry in industries:
+            if industry.parent_id is not None:
+                children.setdefault(industry.parent_id, []).append(industry)
+        return industries, children
+
     def get_all_industry_tree(
         self, industry_classification: str
     ) -> dict[str, Any]:
@@ -1701,43 +2146,47 @@ class XbrlIndexDB:
         - 'NAICS'
         """
 
-        def child_industry(_industries: Query[Any]) -> dict[str, Any]:
+        industries, children = self._get_industries_children()
+
+        def industry_key(i: Any) -> str:
+            return "|".join(
+                (str(i.depth), str(i.industry_code), i.industry_description)
+            )
+
+        def child_industry(_industries: list[Any]) -> dict[str, Any]:
             return {
-                "|".join(
-                    (
-                        str(i.depth),
-                        str(i.industry_code),
-                        i.industry_description,
-                    )
-                ): child_industry(i.children)
-                if len(i.children) > 0
+                industry_key(i): child_industry(children[i.industry_id])
+                if children.get(i.industry_id)
                 else None
                 for i in _industries
             }
 
         industry_dict: dict[str, Any] = {}
-        with Session(self.engine) as session:
-            industry = (
-                session.query(SEC.SecIndustry)
-                .filter(
-                    SEC.SecIndustry.depth == 1,
-                    SEC.SecIndustry.industry_classification
-                    == industry_classification,
-                )
-                .order_by(SEC.SecIndustry.industry_code)
+        for i in sorted(
+            (
+                x
+                for x in industries
+                if x.depth == 1
+                and x.industry_classification == industry_classification
+            ),
+            key=attrgetter("industry_code"),
+        ):
+            industry_dict[industry_key(i)] = child_industry(
+                children.get(i.industry_id, [])
             )
-            for i in industry:
-                industry_dict[
-                    "|".join(
-                        (
-                            str(i.depth),
-                            str(i.industry_code),
-                            i.industry_description,
-                        )
-                    )
-                ] = child_industry(i.children)
         return industry_dict
 
+    def _csv_like(self, col: Any, csv_values: str) -> Any:
+        """Case insensitive match of `col` to any of comma separated
+        partial values, one `LIKE ANY` predicate on postgres"""
+        # an empty value matches everything as before
+        patterns = [
+            "%" + x.lower() + "%" for x in split_csv(csv_values)
+        ] or ["%"]
+        if self.product == "postgres":
+            return func.lower(col).like(any_(array(patterns)))
+        return or_(*[func.lower(col).like(x) for x in patterns])
+
     def search_filings(
         self,
         filing_system: Literal["sec", "esef"],
@@ -1776,57 +2225,32 @@ class XbrlIndexDB:
                 "filing_system must be one of `esef` or `sec`",
             )
 
-        def check_date(param: Any, param_name: str) -> bool:
+        def parse_date(param: Any, param_name: str) -> datetime.datetime:
             date_format_msg = (
                 "param {} must be a valid date in formate 2022-10-21"
             )
+            # fast path for iso dates, fall back to dateutil for the rest
+            try:
+                return datetime.datetime.fromisoformat(param)
+            except (TypeError, ValueError):
+                pass
             try:
-                parser.parse(param)
+                return parser.parse(param)
             except Exception as err:
                 raise XIDBException(
                     constants.ERR_BAD_SEARCH_PARAM,
                     date_format_msg.format(param_name),
                 ) from err
-            return True
 
         filter_list = []
-        filings_table_q: Query[Any] = {
-            "esef": (
-                Query(ESEF.EsefFiling)  # type: ignore[arg-type]
-                .select_from(ESEF.EsefFiling)
-                .join(
-                    ESEF.EsefEntity,
-                    ESEF.EsefFiling.entity_lei == ESEF.EsefEntity.entity_lei,
-                    isouter=True,
-                )
-                .join(
-                    BASE_M.Location,
-                    ESEF.EsefFiling.country == BASE_M.Location.alpha_2,
-                    isouter=True,
-                )
-                .distinct()
-            ),
-            "sec": (
-                Query(SEC.SecFiling)  # type: ignore[arg-type]
-                .select_from(SEC.SecFiling)
-                .join(
-                    SEC.SecCikTickerMapping,
-                    SEC.SecFiling.cik_number
-                    == SEC.SecCikTickerMapping.cik_number,
-                    isouter=True,
-                )
-                .join(
-                    SEC.SecIndustry,
-                    and_(
-                        SEC.SecIndustry.industry_classification == "SEC",
-                        SEC.SecFiling.assigned_sic
-                        == SEC.SecIndustry.industry_code,
-                    ),
-                    isouter=True,
-                )
-                .distinct()
-            ),
-        }[filing_system]
+        # only build the query of the requested filing system, related
+        # tables are filtered with subqueries so that filings are neither
+        # repeated by joins nor need a DISTINCT
+        filings_table_q: Query[Any]
+        if filing_system == "esef":
+            filings_table_q = Query(ESEF.EsefFiling)  # type: ignore[arg-type]
+        else:
+            filings_table_q = Query(SEC.SecFiling)  # type: ignore[arg-type]
 
         filing_number_col = {
             "esef": ESEF.EsefFiling.filing_key,
@@ -1836,10 +2260,6 @@ class XbrlIndexDB:
             "esef": ESEF.EsefFiling.entity_lei,
             "sec": SEC.SecFiling.cik_number,
         }[filing_system]
-        filer_name_col = {
-            "esef": ESEF.EsefEntity.lei_legal_name,
-            "sec": SEC.SecFiling.company_name,
-        }[filing_system]
         pub_date_from_col = {
             "esef": ESEF.EsefFiling.date_added,
             "sec": SEC.SecFiling.pub_date,
@@ -1850,37 +2270,30 @@ class XbrlIndexDB:
         }[filing_system]
 
         if publication_date_from is not None:
-            checked = check_date(
-                publication_date_from, "publication_date_from"
+            filter_list.append(
+                pub_date_from_col
+                >= parse_date(publication_date_from, "publication_date_from")
             )
-            if checked:
-                filter_list.append(
-                    pub_date_from_col >= parser.parse(publication_date_from)
-                )
 
         if publication_date_to is not None:
-            checked = check_date(publication_date_to, "publication_date_to")
-            if checked:
-                filter_list.append(
-                    pub_date_from_col
-                    < parser.parse(publication_date_to)
-                    + datetime.timedelta(days=1)
-                )
+            filter_list.append(
+                pub_date_from_col
+                < parse_date(publication_date_to, "publication_date_to")
+                + constants.ONE_DAY
+            )
 
         if report_date_from is not None:
-            checked = check_date(report_date_from, "report_date_from")
-            if checked:
-                filter_list.append(
-                    report_date_from_col >= parser.parse(report_date_from)
-                )
+            filter_list.append(
+                report_date_from_col
+                >= parse_date(report_date_from, "report_date_from")
+            )
 
         if report_date_to is not None:
-            checked = check_date(report_date_to, "report_date_to")
-            if checked:
-                filter_list.append(
-                    report_date_from_col
-                    < parser.parse(report_date_to) + datetime.timedelta(days=1)
-                )
+            filter_list.append(
+                report_date_from_col
+                < parse_date(report_date_to, "report_date_to")
+                + constants.ONE_DAY
+            )
 
         if filing_number is not None:
             if not isinstance(filing_number, str):
@@ -1892,7 +2305,7 @@ class XbrlIndexDB:
                 )
             filter_list.append(
                 filing_number_col.in_(
-                    [x.strip() for x in filing_number.split(",")]
+                    split_csv(filing_number)
                 )
             )
 
@@ -1904,11 +2317,18 @@ class XbrlIndexDB:
                     "separated FULL and EXISTING SEC cik number(s) or ESEF "
                     "index lei(s)",
                 )
-            filter_list.append(
-                func.lower(filer_identifier_col).in_(
-                    [x.strip() for x in filer_identifier.split(",")]
+            # cik numbers are digits, compared as is so that the cik
+            # index is used, lei is matched on its lower() index
+            if filing_system == "esef":
+                filter_list.append(
+                    func.lower(filer_identifier_col).in_(
+                        split_csv(filer_identifier)
+                    )
+                )
+            else:
+                filter_list.append(
+                    filer_identifier_col.in_(split_csv(filer_identifier))
                 )
-            )
 
         if industry_code is not None:
             if not isinstance(industry_code, str):
@@ -1921,7 +2341,7 @@ class XbrlIndexDB:
             if filing_system == "sec" and industry_code_tree is None:
                 filter_list.append(
                     SEC.SecFiling.assigned_sic.in_(
-                        [int(x.strip()) for x in industry_code.split(",")]
+                        split_csv(industry_code, int)
                     )
                 )
             elif filing_system == "esef" or industry_code_tree is not None:
@@ -1944,16 +2364,17 @@ class XbrlIndexDB:
             if (
                 filing_system == "sec"
                 and industry_code is None
-                and industry_code_tree is NotImplemented
+                and industry_code_tree is None
             ):
                 filter_list.append(
-                    or_(
-                        *[
-                            func.lower(
-                                SEC.SecIndustry.industry_description
-                            ).like("%" + x.lower().strip() + "%")
-                            for x in industry_name.split(",")
-                        ]
+                    SEC.SecFiling.assigned_sic.in_(
+                        select(SEC.SecIndustry.industry_code).where(
+                            SEC.SecIndustry.industry_classification == "SEC",
+                            self._csv_like(
+                                SEC.SecIndustry.industry_description,
+                                industry_name,
+                            ),
+                        )
                     )
                 )
             elif (
@@ -1978,13 +2399,10 @@ class XbrlIndexDB:
                     "valid for SEC filings only",
                 )
             if filing_system == "sec":
-                _param = [
-                    int(x.strip()) for x in industry_code_tree.split(",")
-                ]
-                industry_tree = self.get_an_industry_tree(
-                    industry_codes=_param
+                _param = split_csv(industry_code_tree, int)
+                industry_tree_codes = self._industry_tree_codes(
+                    tuple(sorted(set(_param)))
                 )
-                industry_tree_codes = [x[0] for x in industry_tree]
                 filter_list.append(
                     SEC.SecFiling.assigned_sic.in_(industry_tree_codes)
                 )
@@ -2007,7 +2425,7 @@ class XbrlIndexDB:
             if filing_system == "esef":
                 filter_list.append(
                     ESEF.EsefFiling.country.in_(
-                        [x.strip() for x in esef_country_alpha2.split(",")]
+                        split_csv(esef_country_alpha2)
                     )
                 )
             elif filing_system == "sec":
@@ -2028,13 +2446,12 @@ class XbrlIndexDB:
                 )
             if filing_system == "esef" and esef_country_alpha2 is None:
                 filter_list.append(
-                    or_(
-                        *[
-                            func.lower(BASE_M.Location.country).like(
-                                "%" + x.lower().strip() + "%"
+                    ESEF.EsefFiling.country.in_(
+                        select(BASE_M.Location.alpha_2).where(
+                            self._csv_like(
+                                BASE_M.Location.country, esef_country_name
                             )
-                            for x in esef_country_name.split(",")
-                        ]
+                        )
                     )
                 )
             elif filing_system == "sec" or esef_country_alpha2 is not None:
@@ -2055,14 +2472,7 @@ class XbrlIndexDB:
                 )
             if filing_system == "sec":
                 filter_list.append(
-                    or_(
-                        *[
-                            func.lower(SEC.SecFiling.form_type).like(
-                                "%" + x.lower().strip() + "%"
-                            )
-                            for x in form_type.split(",")
-                        ]
-                    )
+                    self._csv_like(SEC.SecFiling.form_type, form_type)
                 )
             elif filing_system == "esef":
                 self.cntlr.addToLog(
@@ -2078,16 +2488,20 @@ class XbrlIndexDB:
                     "filer_name should be a string of one or more "
                     "comma separated full or partial filer/company name(s)",
                 )
-            filter_list.append(
-                or_(
-                    *[
-                        func.lower(filer_name_col).like(
-                            "%" + x.lower().strip() + "%"
+            if filing_system == "esef":
+                filter_list.append(
+                    ESEF.EsefFiling.entity_lei.in_(
+                        select(ESEF.EsefEntity.entity_lei).where(
+                            self._csv_like(
+                                ESEF.EsefEntity.lei_legal_name, filer_name
+                            )
                         )
-                        for x in filer_name.split(",")
-                    ]
+                    )
+                )
+            else:
+                filter_list.append(
+                    self._csv_like(SEC.SecFiling.company_name, filer_name)
                 )
-            )
 
         if filer_ticker_symbol is not None:
             if not isinstance(filer_ticker_symbol, str):
@@ -2099,13 +2513,13 @@ class XbrlIndexDB:
                 )
             if filing_system == "sec":
                 filter_list.append(
-                    or_(
-                        *[
-                            func.lower(
-                                SEC.SecCikTickerMapping.ticker_symbol
-                            ).like("%" + x.lower().strip() + "%")
-                            for x in filer_ticker_symbol.split(",")
-                        ]
+                    SEC.SecFiling.cik_number.in_(
+                        select(SEC.SecCikTickerMapping.cik_number).where(
+                            self._csv_like(
+                                SEC.SecCikTickerMapping.ticker_symbol,
+                                filer_ticker_symbol,
+                            )
+                        )
                     )
                 )
             elif filing_system == "esef":
@@ -2115,7 +2529,7 @@ class XbrlIndexDB:
                     **log_template("warning", self.database),
                 )
 
-        result_qry = filings_table_q
+        result_qry: Query[Any] = filings_table_q
         if len(filter_list) > 0:
             result_qry = result_qry.filter(and_(*filter_list))
         if random:
@@ -2126,12 +2540,27 @@ class XbrlIndexDB:
                 )
             else:
                 assert isinstance(self.product, str)
-                result_qry = result_qry.order_by(
-                    random_function[self.product]()
-                )
                 if limit is None:
                     # mandatory to have a limit if random
                     limit = 20
+                # sort only the matching filing ids randomly instead of the
+                # whole rows, nested so that mysql accepts the limit
+                if filing_system == "esef":
+                    filing_id_col = ESEF.EsefFiling.filing_id
+                else:
+                    filing_id_col = SEC.SecFiling.filing_id
+                matching_ids = result_qry.with_entities(
+                    filing_id_col.label("filing_id")
+                ).subquery()
+                sampled_ids = (
+                    select(matching_ids.c.filing_id)
+                    .order_by(random_function[self.product]())
+                    .limit(limit)
+                    .subquery()
+                )
+                result_qry = filings_table_q.filter(
+                    filing_id_col.in_(select(sampled_ids.c.filing_id))
+                )
         if limit:
             result_qry = result_qry.limit(limit)
         return result_qry
@@ -2146,8 +2575,10 @@ class XbrlIndexDB:
         """Get all child industries starting for one or more
         industry code(s)"""
 
+        industries, children = self._get_industries_children()
+
         def get_industry_row(
-            inst: SEC.SecIndustry,
+            inst: Any,
             tree_list: list[tuple[int, str, str, int]],
             verbose: bool,
             style: Literal["indented", "csv"],
@@ -2167,22 +2598,19 @@ class XbrlIndexDB:
                         "\t" * (row[-1] - 1),
                         f"{row[0]} - {row[1]} ({row[2]} depth {row[-1]})",
                     )
-            if len(inst.children) > 0:
-                for child in inst.children:
-                    get_industry_row(child, tree_list, verbose, style)
+            for child in children.get(inst.industry_id, []):
+                get_industry_row(child, tree_list, verbose, style)
+
+        def is_start_industry(inst: Any) -> bool:
+            if inst.industry_classification != industry_classification.upper():
+                return False
+            if industry_codes is not None:
+                return inst.industry_code in industry_codes
+            # make sure depth is 1 if we are getting everything
+            return bool(inst.depth == 1)
 
-        filter_list = [
-            SEC.SecIndustry.industry_classification
-            == industry_classification.upper(),
-        ]
         if industry_codes is not None:
             assert isinstance(industry_codes, list)
-            filter_list.append(
-                SEC.SecIndustry.industry_code.in_(industry_codes)
-            )
-        else:
-            # make sure depth is 1 if we are getting everything
-            filter_list.append(SEC.SecIndustry.depth == 1)
         tree_list: list[tuple[int, str, str, int]] = []
         if verbose:
             if style == "csv":
@@ -2196,14 +2624,28 @@ class XbrlIndexDB:
                         ]
                     )
                 )
-        with Session(self.engine) as session:
-            industry_table = session.query(SEC.SecIndustry).filter(
-                and_(*filter_list)
-            )
-            for x in industry_table:
+        for x in industries:
+            if is_start_industry(x):
                 get_industry_row(x, tree_list, verbose, style)
         return tree_list
 
+    def _industry_tree_codes(
+        self,
+        industry_codes: tuple[int, ...],
+        industry_classification: Literal["SEC", "SIC", "NAICS"] = "SEC",
+    ) -> tuple[int, ...]:
+        """Codes of the industries tree starting from `industry_codes`,
+        cached as industries are static reference data"""
+        key = (industry_codes, industry_classification)
+        if key not in self._industry_tree_codes_cache:
+            self._industry_tree_codes_cache[key] = tuple(
+                x[0]
+                for x in self.get_an_industry_tree(
+                    list(industry_codes), industry_classification
+                )
+            )
+        return self._industry_tree_codes_cache[key]
+
     def list_countries_info(
         self, verbose: bool = False
     ) -> list[tuple[str, str, str | None, float, float]]:
@@ -2221,17 +2663,25 @@ class XbrlIndexDB:
                     ]
                 )
             )
-        with Session(self.engine) as session:
-            locations = session.query(BASE_M.Location)
-            for loc in locations:
+        locations_qry = select(
+            BASE_M.Location.code,
+            BASE_M.Location.country,
+            BASE_M.Location.state_province,
+            BASE_M.Location.longitude,
+            BASE_M.Location.latitude,
+        )
+        with self.engine.connect() as conn:
+            for code, country, state_province, longitude, latitude in (
+                conn.execute(locations_qry)
+            ):
                 row = (
-                    str(loc.code),
-                    str(loc.country),
-                    str(loc.state_province)
-                    if loc.state_province is not None
-                    else loc.state_province,
-                    float(loc.longitude),
-                    float(loc.latitude),
+                    str(code),
+                    str(country),
+                    str(state_province)
+                    if state_province is not None
+                    else state_province,
+                    float(longitude),
+                    float(latitude),
                 )
                 countries.append(row)
                 if verbose:
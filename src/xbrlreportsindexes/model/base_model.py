@@ -6,8 +6,11 @@ from __future__ import annotations
 
 import datetime
 import re
+from functools import lru_cache
+from operator import attrgetter
 from re import Pattern
 from typing import Any
+from typing import cast
 from typing import Union
 
 from sqlalchemy import BOOLEAN
@@ -41,6 +44,15 @@ def replace_caps(word: str) -> str:
 meta: MetaData = MetaData()
 
 
+@lru_cache(maxsize=None)
+def _cols_getter(model: type) -> tuple[list[str], Any]:
+    """Column names of a model and a getter of their values, resolved
+    once per model"""
+    table = getattr(model, "__table__", Table())
+    cols: list[str] = list(table.columns.keys())
+    return cols, attrgetter(*cols) if cols else None
+
+
 class _Base:
     """Base model with common utilities"""
 
@@ -61,11 +73,13 @@ class _Base:
 
     def to_dict(self) -> dict[str, Any]:
         """Convert instance to dict"""
-        table = getattr(self, "__table__", Table())
-        result_dict = {}
-        for col in table.columns.keys():
-            result_dict[col] = getattr(self, col, None)
-        return result_dict
+        # mypy does not see mapped classes as hashable
+        cols, cols_getter = _cols_getter(cast(type, type(self)))
+        if not cols:
+            return {}
+        if len(cols) == 1:
+            return {cols[0]: cols_getter(self)}
+        return dict(zip(cols, cols_getter(self)))
 
 
 Base: type = declarative_base(cls=_Base, metadata=meta)
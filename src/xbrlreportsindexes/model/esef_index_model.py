@@ -10,6 +10,8 @@ from urllib.parse import urljoin
 from lxml import etree
 from sqlalchemy import Column
 from sqlalchemy import false
+from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy import true
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import BOOLEAN
@@ -32,7 +34,11 @@ Location.__mapper__.add_property(
 class EsefFiling(Base, CreatedUpdatedAtColMixin):
     """Stores filings"""
 
-    __table_args__ = {"comment": "esef_index"}
+    __table_args__ = (
+        # country and date added search
+        Index("ix_esef_filing_country_date_added", "country", "date_added"),
+        {"comment": "esef_index"},
+    )
 
     filing_id = Column(
         types_mapping.Bigint_type, primary_key=True, autoincrement=True
@@ -251,6 +257,10 @@ class EsefFiling(Base, CreatedUpdatedAtColMixin):
         return item
 
 
+# lei search compares lower(entity_lei)
+Index("ix_esef_filing_entity_lei_lower", func.lower(EsefFiling.entity_lei))
+
+
 class EsefEntity(Base, CreatedUpdatedAtColMixin):
     """ESEF entity information based on lei"""
 
@@ -11,6 +11,7 @@ from sqlalchemy import and_
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
 from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy import join
 from sqlalchemy import select
 from sqlalchemy.orm import aliased
@@ -37,6 +38,16 @@ try:
 except ModuleNotFoundError as exc:
     raise Exception("Please add path to arelle to python path") from exc
 
+edgar_ns: str = "https://www.sec.gov/Archives/edgar"
+edgar_nsmap: dict[str, str] = {"edgar": edgar_ns}
+# clark notation names of rss file element and attributes
+edgar_xbrl_file_tag: str = str(QName(edgar_ns, "xbrlFile"))
+edgar_xbrl_file_attribs: tuple[str, ...] = tuple(
+    str(QName(edgar_ns, x))
+    for x in ("sequence", "file", "type", "size", "description", "url")
+)
+edgar_inline_xbrl_attrib: str = str(QName(edgar_ns, "inlineXBRL"))
+
 
 LAST_MODIFIED_DATE_COL = "last_modified_date"
 
@@ -80,7 +91,14 @@ class SecFiling(
 ):
     """SEC xbrl filing information"""
 
-    __table_args__ = {"comment": "sec_rss"}
+    __table_args__ = (
+        Index("ix_sec_filing_cik_number_filing_id", "cik_number", "filing_id"),
+        # industry and publication date search
+        Index(
+            "ix_sec_filing_assigned_sic_pub_date", "assigned_sic", "pub_date"
+        ),
+        {"comment": "sec_rss"},
+    )
     # columns
     filing_link = Column(types_mapping.Text_type, nullable=True)
     filing_title = Column(types_mapping.Text_type, nullable=True)
@@ -163,8 +181,6 @@ class SecFiling(
             type="application/zip",
         )
 
-        edgar_ns = "https://www.sec.gov/Archives/edgar"
-        edgar_nsmap = {"edgar": edgar_ns}
         xbrl_filing_element = etree.SubElement(
             item,
             QName("https://www.sec.gov/Archives/edgar", tag="xbrlFiling"),
@@ -191,7 +207,6 @@ class SecFiling(
                 xbrl_filing_element, QName(edgar_ns, tag), nsmap=edgar_nsmap
             ).text = value
 
-        xbrl_files = xbrl_filing_element.find("edgar:xbrlFiles", edgar_nsmap)
         xbrl_files = etree.SubElement(
             xbrl_filing_element,
             QName(edgar_ns, "xbrlFiles"),
@@ -282,23 +297,23 @@ class SecFile(
 
     def to_xml(self, parent: etree._Element) -> etree._Element:
         """Returns file element similar to SEC rss feed file element"""
-        edgar_ns = "https://www.sec.gov/Archives/edgar"
-        edgar_nsmap = {"edgar": edgar_ns}
         xbrl_file = etree.SubElement(
-            parent,
-            QName(edgar_ns, "xbrlFile"),
-            nsmap=edgar_nsmap,
+            parent, edgar_xbrl_file_tag, nsmap=edgar_nsmap
         )
-        xbrl_file.attrib[str(QName(edgar_ns, "sequence"))] = str(self.sequence)
-        xbrl_file.attrib[str(QName(edgar_ns, "file"))] = str(self.file)
-        xbrl_file.attrib[str(QName(edgar_ns, "type"))] = str(self.type)
-        xbrl_file.attrib[str(QName(edgar_ns, "size"))] = str(self.size)
-        xbrl_file.attrib[str(QName(edgar_ns, "description"))] = str(
-            self.description
-        )
-        xbrl_file.attrib[str(QName(edgar_ns, "url"))] = str(self.url)
+        for attr_name, attr_value in zip(
+            edgar_xbrl_file_attribs,
+            (
+                self.sequence,
+                self.file,
+                self.type,
+                self.size,
+                self.description,
+                self.url,
+            ),
+        ):
+            xbrl_file.attrib[attr_name] = str(attr_value)
         if self.inline_xbrl:
-            xbrl_file.attrib[str(QName(edgar_ns, "inlineXBRL"))] = "true"
+            xbrl_file.attrib[edgar_inline_xbrl_attrib] = "true"
 
         return xbrl_file
 
@@ -0,0 +1,153 @@
+"""Test data utilities helpers"""
+from __future__ import annotations
+
+import gzip
+import os
+import pathlib
+import pickle
+import time
+from types import SimpleNamespace
+from typing import Any
+from urllib.request import Request
+
+import pytest
+from xbrlreportsindexes.core import constants
+from xbrlreportsindexes.core.data_utils import get_feed_cache_path
+from xbrlreportsindexes.core.data_utils import gzip_magic
+from xbrlreportsindexes.core.data_utils import infer_esef_filing_language
+from xbrlreportsindexes.core.data_utils import iter_pickled_rows
+from xbrlreportsindexes.core.data_utils import load_cached_feed
+from xbrlreportsindexes.core.data_utils import load_pickled_table_data
+from xbrlreportsindexes.core.data_utils import pickle_rows
+from xbrlreportsindexes.core.data_utils import split_csv
+from xbrlreportsindexes.core.data_utils import store_cached_feed
+from xbrlreportsindexes.core.data_utils import TokenBucket
+
+
+rows: list[dict[str, Any]] = [{"id": i, "name": f"row {i}"} for i in range(5)]
+
+
+@pytest.mark.parametrize("chunk_size", [2, 5, 10000])
+def test_pickle_rows_round_trip(
+    tmp_path: pathlib.Path, chunk_size: int
+) -> None:
+    """Rows pickled in chunks are read back in order"""
+    store_filename = str(tmp_path.joinpath("table-data.pkl"))
+    assert pickle_rows(iter(rows), store_filename, chunk_size) == len(rows)
+    with open(store_filename, "rb") as pkl:
+        assert pkl.read(2) == gzip_magic
+    assert list(iter_pickled_rows(store_filename)) == rows
+    assert load_pickled_table_data(store_filename) == rows
+
+
+def test_pickle_rows_empty(tmp_path: pathlib.Path) -> None:
+    """No rows are read back from an empty table"""
+    store_filename = str(tmp_path.joinpath("table-data.pkl"))
+    assert pickle_rows([], store_filename) == 0
+    assert load_pickled_table_data(store_filename) == []
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_iter_pickled_rows_legacy(
+    tmp_path: pathlib.Path, compressed: bool
+) -> None:
+    """Files holding a single pickled list are still supported"""
+    store_filename = str(tmp_path.joinpath("table-data.pkl"))
+    if compressed:
+        with gzip.open(store_filename, "wb") as gz_pkl:
+            pickle.dump(rows, gz_pkl)
+    else:
+        with open(store_filename, "wb") as pkl:
+            pickle.dump(rows, pkl)
+    assert list(iter_pickled_rows(store_filename)) == rows
+
+
+@pytest.mark.parametrize(
+    "value, cast_to, result",
+    [
+        ("a, b ,c", str, ["a", "b", "c"]),
+        ("a,b,", str, ["a", "b"]),
+        (" 10-K , ,10-Q ", str, ["10-K", "10-Q"]),
+        ("1000, 3500,", int, [1000, 3500]),
+        ("", str, []),
+        (",", str, []),
+    ],
+)
+def test_split_csv(value: str, cast_to: Any, result: list[Any]) -> None:
+    """Comma separated values are stripped and empty values dropped"""
+    assert split_csv(value, cast_to) == result
+
+
+def test_token_bucket() -> None:
+    """Burst up to capacity, then acquire at `rate` per second"""
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    bucket.acquire()
+    bucket.acquire()
+    # two tokens refilled at 20 per second
+    assert time.monotonic() - start >= 0.09
+
+
+class MockOpener:
+    """Records requests and answers them with a fixed ETag"""
+
+    instance = (
+        b'{"facts": {"f1": {"value": "x", '
+        b'"dimensions": {"concept": "a", "language": "en"}}}}'
+    )
+
+    def __init__(self) -> None:
+        self.requests: list[str] = []
+
+    def open(self, url: str | Request, timeout: int = 0) -> Any:
+        method = url.get_method() if isinstance(url, Request) else "GET"
+        self.requests.append(method)
+        return SimpleNamespace(
+            code=200,
+            headers={"ETag": '"v1"'},
+            read=lambda: self.instance,
+            close=lambda: None,
+        )
+
+
+def test_infer_esef_filing_language_cache(tmp_path: pathlib.Path) -> None:
+    """New instances take one request, cached ones are revalidated"""
+    opener = MockOpener()
+    cntlr: Any = SimpleNamespace(
+        db_cache_dir=str(tmp_path), webCache=SimpleNamespace(opener=opener)
+    )
+    url = "https://filings.xbrl.org/instance.json"
+    langs = infer_esef_filing_language(cntlr, url)
+    assert opener.requests == ["GET"]
+    assert langs[0]["lang"] == "en"
+    assert infer_esef_filing_language(cntlr, url) == langs
+    assert opener.requests == ["GET", "HEAD"]
+
+
+def test_feeds_cache(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Cached feeds are read back, least recently used ones are pruned"""
+    monkeypatch.setattr(constants, "FEEDS_CACHE_MAX_FILES", 2)
+    cntlr: Any = SimpleNamespace(db_cache_dir=str(tmp_path))
+    links = [f"https://www.sec.gov/xbrlrss-2022-0{i}.xml" for i in range(3)]
+    for i, link in enumerate(links):
+        store_cached_feed(cntlr, link, "2022", {"feed_id": i}, rows, [])
+        cache_path = get_feed_cache_path(cntlr, link, "2022")
+        assert isinstance(cache_path, str)
+        os.utime(cache_path, (i, i))
+        assert load_cached_feed(cntlr, link, "2022") == (
+            {"feed_id": i},
+            rows,
+            [],
+        )
+        # loading marks the feed as recently used
+        assert os.stat(cache_path).st_mtime > i
+        os.utime(cache_path, (i, i))
+    assert load_cached_feed(cntlr, links[0], "2022") is None
+    assert load_cached_feed(cntlr, links[2], "2023") is None
+    feeds_dir = tmp_path.joinpath(constants.FEEDS_CACHE_DIR_NAME)
+    assert len(os.listdir(feeds_dir)) == 2
@@ -0,0 +1,30 @@
+"""Test database utilities helpers"""
+from __future__ import annotations
+
+import datetime
+
+from xbrlreportsindexes.core.db_utils import copy_text_rows
+from xbrlreportsindexes.model import BASE
+from xbrlreportsindexes.model import SEC
+
+
+def test_copy_text_rows() -> None:
+    """Rows are encoded in postgres COPY text format in table columns
+    order, columns missing from some rows are NULL in these rows"""
+    table = BASE.metadata.tables[str(SEC.SecFormerNames.__tablename__)]
+    cols, buffer = copy_text_rows(
+        table,
+        [
+            {"name": "a\tb\\c\nd\re", "cik_number": "0000000001"},
+            {
+                "cik_number": "0000000002",
+                "date_changed": datetime.datetime(2022, 8, 1),
+                "name": None,
+            },
+        ],
+    )
+    assert cols == ["cik_number", "name", "date_changed"]
+    assert buffer.read() == (
+        "0000000001\ta\\tb\\\\c\\nd\\re\t\\N\n"
+        "0000000002\t\\N\t2022-08-01 00:00:00\n"
+    )
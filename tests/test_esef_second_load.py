@@ -107,6 +107,30 @@ def test_esef_data(table: Any, sort_cols: Any) -> None:
                 "25940037UC4MNP02D242/2020-12-31/ESEF/PL/0",
             },
         ),
+        (
+            {"filer_name": "macfarlane, caixa"},
+            {
+                "213800LVRYDERSJAAZ73/2021-12-31/ESEF/GB/0",
+                "7CUNS533WID6K7DGFI87/2020-12-31/ESEF/ES/0",
+                "7CUNS533WID6K7DGFI87/2021-12-31/ESEF/ES/0",
+            },
+        ),
+        (
+            {"filer_identifier": "259400t6crxyog6h8u09"},
+            {"259400T6CRXYOG6H8U09/2021-12-31/ESEF/PL/0"},
+        ),
+        (
+            {"esef_country_name": "spain"},
+            {
+                "7CUNS533WID6K7DGFI87/2020-12-31/ESEF/ES/0",
+                "7CUNS533WID6K7DGFI87/2021-12-31/ESEF/ES/0",
+            },
+        ),
+        (
+            {"esef_country_name": "united king", "filer_name": "ocean"},
+            {"213800U1K395G8PK4I21/2021-12-31/ESEF/GB/0"},
+        ),
+        ({"esef_country_name": "france"}, set()),
     ],
 )
 def test_search(search_params: dict[str, str], result: set[str]) -> None:
@@ -116,3 +140,14 @@ def test_search(search_params: dict[str, str], result: set[str]) -> None:
     with Session(db.engine) as session:
         res = {x.filing_key for x in q.with_session(session)}
     assert res == result
+
+
+def test_search_random() -> None:
+    """Random search returns `limit` distinct filings"""
+    q = db.search_filings("esef", random=True, limit=4)
+    with Session(db.engine) as session:
+        all_keys = {x.filing_key for x in session.query(ESEF.EsefFiling)}
+        res = [x.filing_key for x in q.with_session(session)]
+    assert len(res) == 4
+    assert len(set(res)) == 4
+    assert set(res) <= all_keys
@@ -1,9 +1,12 @@
 """Test database initialization"""
 from __future__ import annotations
 
+import pathlib
+
 import pytest
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
+from xbrlreportsindexes.core import constants
 from xbrlreportsindexes.core import index_db
 
 from .const import test_data_dir
@@ -35,3 +38,18 @@ def test_count_rows(table: str, count_rows: int) -> None:
     with Session(db.engine) as session:
         db_rows = session.query(db.metadata.tables[table]).count()
     assert db_rows == count_rows
+
+
+def test_initialize_cache_dir(tmp_path: pathlib.Path) -> None:
+    """Cache dir copy holds source cache files and keeps sub folders"""
+    cache_dir = tmp_path.joinpath(constants.LOCAL_CACHE_DIR_NAME)
+    feeds_dir = cache_dir.joinpath(constants.FEEDS_CACHE_DIR_NAME)
+    feeds_dir.mkdir(parents=True)
+    feeds_dir.joinpath("feed.pkl.gz").write_bytes(b"")
+    cache_dir.joinpath("old_table-data.pkl").write_bytes(b"")
+    assert index_db.initialize_cache_dir(tmp_path) == cache_dir
+    source_dir = index_db.initialize_cache_dir(tmp_path, is_test=True)
+    assert sorted(x.name for x in cache_dir.iterdir() if x.is_file()) == (
+        sorted(x.name for x in source_dir.iterdir() if x.is_file())
+    )
+    assert feeds_dir.joinpath("feed.pkl.gz").is_file()
@@ -0,0 +1,76 @@
+"""Test loading new SEC feeds from feeds cache"""
+from __future__ import annotations
+
+import hashlib
+import pathlib
+from typing import Any
+
+import pytest
+from sqlalchemy.orm import Session
+from xbrlreportsindexes.core import data_utils
+from xbrlreportsindexes.core import index_db
+from xbrlreportsindexes.model import SEC
+
+from .const import test_data_dir
+
+
+def get_rows(db: index_db.XbrlIndexDB) -> dict[str, list[dict[str, Any]]]:
+    """Filings and files rows of `db` without insert timestamps"""
+    rows: dict[str, list[dict[str, Any]]] = {"filings": [], "files": []}
+    with Session(db.engine) as session:
+        for key, qry in (
+            ("filings", session.query(SEC.SecFiling).order_by("filing_id")),
+            ("files", session.query(SEC.SecFile).order_by("file_id")),
+        ):
+            for x in qry:
+                row = x.to_dict()
+                row.pop("created_updated_at")
+                rows[key].append(row)
+    return rows
+
+
+def test_feeds_cache_hit(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A new feed already extracted is inserted without loading it"""
+
+    def get_feed_cache_path(
+        cntlr: Any, link: str, last_modified_date: Any
+    ) -> str:
+        # test feeds are local files, which are not cached otherwise
+        key = hashlib.blake2b(link.encode(), digest_size=16).hexdigest()
+        return str(tmp_path.joinpath(key + ".pkl.gz"))
+
+    monkeypatch.setattr(data_utils, "get_feed_cache_path", get_feed_cache_path)
+    db = index_db.XbrlIndexDB.make_test_db(
+        test_data_dir=test_data_dir(), verbose=False
+    )
+    assert isinstance(db._db_mock_test_data_dir, pathlib.Path)
+    loc = db._db_mock_test_data_dir.joinpath(
+        "sec", "monthly", "monthly_01.html"
+    ).as_uri()
+    db.update_feeds(loc=loc, include_latest=False)
+    assert len(list(tmp_path.iterdir())) == 1
+    rows = get_rows(db)
+    assert rows["filings"] and rows["files"]
+
+    loads: list[Any] = []
+    load_and_prep_feed = db._load_and_prep_feed
+    prefetch_rss_feeds = index_db.prefetch_rss_feeds
+
+    def count_loads(*args: Any, **kwargs: Any) -> Any:
+        loads.append(args)
+        return load_and_prep_feed(*args, **kwargs)
+
+    def count_prefetches(
+        cntlr: Any, feeds: list[dict[str, Any]], *args: Any
+    ) -> list[str]:
+        loads.extend(feeds)
+        return prefetch_rss_feeds(cntlr, feeds, *args)
+
+    monkeypatch.setattr(db, "_load_and_prep_feed", count_loads)
+    monkeypatch.setattr(index_db, "prefetch_rss_feeds", count_prefetches)
+    db.verify_initialize_database(reinitialize=True)
+    db.update_feeds(loc=loc, include_latest=False)
+    assert not loads
+    assert get_rows(db) == rows
@@ -1,12 +1,16 @@
 """Test SEC feeds after third load"""
 from __future__ import annotations
 
+import gc
 import pathlib
 import pickle
+import weakref
 from typing import Any
 
 import pytest
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from xbrlreportsindexes.core import data_utils
 from xbrlreportsindexes.core import index_db
 from xbrlreportsindexes.model import SEC
 
@@ -108,6 +112,24 @@ def test_sec_data(table: Any, sort_cols: tuple[Any]) -> None:
             },
             {"0001493152-22-024774", "0001140361-22-031812"},
         ),
+        ({"filer_identifier": "0000810136"}, {"0001140361-22-031812"}),
+        (
+            {"filer_ticker_symbol": "plab, cdev"},
+            {"0001140361-22-031812", "0001193125-22-241104"},
+        ),
+        ({"filer_ticker_symbol": "zzzz"}, set()),
+        (
+            {"industry_name": "real estate, pharmaceutical"},
+            {"0001493152-22-025397", "0001493152-22-024774"},
+        ),
+        (
+            {"industry_code_tree": "3600, 1300"},
+            {"0001140361-22-031812", "0001193125-22-241104"},
+        ),
+        (
+            {"industry_code_tree": "2800", "form_type": "8-K"},
+            {"0001493152-22-024774"},
+        ),
     ],
 )
 def test_search(search_params: dict[str, str], result: set[str]) -> None:
@@ -117,3 +139,85 @@ def test_search(search_params: dict[str, str], result: set[str]) -> None:
     with Session(db.engine) as session:
         res = {x.accession_number for x in q.with_session(session)}
     assert res == result
+
+
+def test_search_random() -> None:
+    """Random search returns `limit` distinct filings"""
+    q = db.search_filings("sec", random=True, limit=3)
+    with Session(db.engine) as session:
+        all_ids = {x.filing_id for x in session.query(SEC.SecFiling)}
+        res = [x.filing_id for x in q.with_session(session)]
+    assert len(res) == 3
+    assert len(set(res)) == 3
+    assert set(res) <= all_ids
+
+
+def test_industry_tree_codes_cache() -> None:
+    """Industry tree codes are cached per instance without keeping it"""
+    other_db = index_db.XbrlIndexDB.make_test_db(
+        test_data_dir=test_data_dir(), verbose=False
+    )
+    q = other_db.search_filings("sec", industry_code_tree="3600, 1300")
+    with Session(other_db.engine) as session:
+        q.with_session(session).all()
+    assert len(other_db._industry_tree_codes_cache) == 1
+    other_db_ref = weakref.ref(other_db)
+    del other_db, q
+    gc.collect()
+    assert other_db_ref() is None
+
+
+def test_update_pickle_table_data(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Refreshing changed filers gives the same cache as a full pickle"""
+    monkeypatch.setattr(db.engine, "db_cache_dir", str(tmp_path))
+    store_filename = data_utils.pickle_table_data(db.engine, SEC.SecFiler)
+    with Session(db.engine) as session:
+        cik, city = session.query(
+            SEC.SecFiler.cik_number, SEC.SecFiler.business_city
+        ).first()
+        session.execute(
+            update(SEC.SecFiler)
+            .where(SEC.SecFiler.cik_number == cik)
+            .values(business_city="changed")
+        )
+        session.commit()
+    try:
+        assert (
+            data_utils.update_pickle_table_data(
+                db.engine, SEC.SecFiler, "cik_number", {cik}
+            )
+            == store_filename
+        )
+        merged = data_utils.load_pickled_table_data(store_filename)
+        data_utils.pickle_table_data(db.engine, SEC.SecFiler)
+        full = data_utils.load_pickled_table_data(store_filename)
+        assert any(x["business_city"] == "changed" for x in merged)
+        assert sorted(merged, key=lambda x: str(x["cik_number"])) == sorted(
+            full, key=lambda x: str(x["cik_number"])
+        )
+
+        pickle_rows = data_utils.pickle_rows
+
+        def fail(*args: Any) -> None:
+            pickle_rows(*args)
+            raise OSError("pickle failed")
+
+        # temp files of failed refreshes are removed
+        monkeypatch.setattr(data_utils, "pickle_rows", fail)
+        with pytest.raises(OSError):
+            data_utils.update_pickle_table_data(
+                db.engine, SEC.SecFiler, "cik_number", {cik}
+            )
+        assert [x.name for x in tmp_path.iterdir()] == [
+            pathlib.Path(store_filename).name
+        ]
+    finally:
+        with Session(db.engine) as session:
+            session.execute(
+                update(SEC.SecFiler)
+                .where(SEC.SecFiler.cik_number == cik)
+                .values(business_city=city)
+            )
+            session.commit()